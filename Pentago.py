@@ -24,11 +24,7 @@
 #   and heuristics (in the Player class) to the student.
 #---------------------------------------------------------------------------
 
-from asyncio.windows_events import NULL
-from functools import cache
-from json.encoder import INFINITY
 import random
-import copy
 import sys, getopt
 import time
 
@@ -60,20 +56,15 @@ Numbering follows the scheme shown below (between 1 and 9), where
 subgrids 1 and 2 are on the top, and 3 and 4 are on the bottom:
 """)
 
-	pb = PentagoBoard()
-
-	for i in range(pb.BOARD_SIZE):
-		for j in range(pb.BOARD_SIZE):
-			pb.board[i][j] = (pb.GRID_SIZE*i + j%pb.GRID_SIZE)%pb.GRID_ELEMENTS + 1
-	print(pb)
+	legend = [ (GRID_SIZE*i + j%GRID_SIZE)%GRID_ELEMENTS + 1 \
+	           for i in range(BOARD_SIZE) for j in range(BOARD_SIZE) ]
+	print(formatBoard(legend))
 
 	print( "\nRotating subgrid " + str(1) + " Right:" )
-	newBoard = pb.rotateRight(1)
-	print(newBoard)
+	print(formatBoard(rotateCells(legend, 1, "R")))
 
 	print( "\nRotating subgrid " + str(3) + " Left:" )
-	newBoard = pb.rotateLeft(3)
-	print(newBoard)
+	print(formatBoard(rotateCells(legend, 3, "L")))
 
 #----------------------------------------------------------------------------
 #  Prompts the user to choose between two options.  
@@ -118,14 +109,19 @@ def twoChoices(question,option1,option2):
 #  Allows game to begin with particular initial state, with Player 1 to 
 #  play first.
 #    python3 Pentago_base.py -b "w.b.bw.w.b.wb.w..wb....w...bw.bbb.ww"
+#
+#  Allows the time computer players spend searching each move to be set
+#  (in seconds, default 5):
+#    python3 Pentago_base.py -t 10
 #----------------------------------------------------------------------------
 def gameSetup(timestamp):
 	pb = PentagoBoard()
 	setupDone = False
+	seconds = DEFAULT_SECONDS
 
 	player = [ None for i in range(2) ]
 	
-	opts, args = getopt.getopt(sys.argv[1:],"b:c:",["board=","config="])
+	opts, args = getopt.getopt(sys.argv[1:],"b:c:t:",["board=","config=","time="])
 	for opt, arg in opts:
 		if opt in ("-b", "--board"):
 			initialState = arg
@@ -142,6 +138,8 @@ def gameSetup(timestamp):
 			player[0] = Player(playerName,playerType,playerToken)
 			player[1] = Player(opponentName,opponentType,opponentToken)			  
 			setupDone = True
+		elif opt in ("-t", "--time"):
+			seconds = float(arg)
 		else:
 			print("Unknown option, " + opt + " " + arg )
 			
@@ -175,6 +173,9 @@ def gameSetup(timestamp):
 		player[1] = Player(playerName,playerType,opponentToken)
 		f.write(playerName + "\n" + playerType + "\n" + opponentToken + "\n")
 		f.close()
+
+	for p in player:
+		p.seconds = seconds
 		
 	return pb, player
 		
@@ -191,6 +192,309 @@ descr = {
 
 
 
+#--------------------------------------------------------------------------------
+# Bitboards:
+#  A position is held as two 36-bit ints, one per color, in which bit 6*i+j is
+#  set if cell [i][j] holds a marble of that color.  Placing a marble is a
+#  single OR.  Rotating a subgrid reads its 9 cells off as a 9-bit number (3
+#  bits per row, row by row), and looks the rotated cells up in a table for
+#  that subgrid and direction.
+#--------------------------------------------------------------------------------
+
+BOARD_SIZE = 6
+GRID_SIZE = 3
+GRID_ELEMENTS = GRID_SIZE * GRID_SIZE
+NUM_CELLS = BOARD_SIZE * BOARD_SIZE
+NUM_BLOCKS = (BOARD_SIZE // GRID_SIZE)**2  # =4
+FULL = (1 << NUM_CELLS) - 1
+
+INFINITY = float("inf")
+
+#-----------------------------------------------------------------------
+# Subgrids are numbered 0..3 here (1..4 in moves), and rotations are
+# indexed by DIRECTION (0: Left, 1: Right)
+#-----------------------------------------------------------------------
+DIRECTION = { "L": 0, "l": 0, "R": 1, "r": 1 }
+
+
+def cellIndex(gameBlock, position):
+#---------------------------------------------------------------------------
+# Cell (bit) index of position 1..9 of gameBlock 1..4
+#---------------------------------------------------------------------------
+	i = (position-1)//GRID_SIZE + GRID_SIZE*((gameBlock-1)//2)
+	j = (position-1)%GRID_SIZE + GRID_SIZE*((gameBlock-1)%2)
+	return BOARD_SIZE*i + j
+
+
+def rotatedPosition(position, d):
+#---------------------------------------------------------------------------
+# Position (0..8) within its subgrid where the marble at position (0..8)
+# goes when the subgrid is rotated Left (d=0) or Right (d=1)
+#---------------------------------------------------------------------------
+	r, c = divmod(position, GRID_SIZE)
+	if d == 1:
+		r, c = c, GRID_SIZE-1-r
+	else:
+		r, c = GRID_SIZE-1-c, r
+	return r*GRID_SIZE + c
+
+
+#-----------------------------------------------------------------------
+# QUADRANT_CELLS[q]    : cell indices of the 9 positions of subgrid q
+# QUADRANT_SHIFT[q]    : cell index of its top-left corner
+# QUADRANT_KEEP[q]     : mask of all the cells outside it
+# ROTATION[q][d][bits] : board bits of the cells of subgrid q, read off as
+#                        bits (see quadrant), after rotating it in direction d
+#-----------------------------------------------------------------------
+QUADRANT_CELLS = [ [ cellIndex(q+1, p+1) for p in range(GRID_ELEMENTS) ] for q in range(NUM_BLOCKS) ]
+QUADRANT_SHIFT = [ cells[0] for cells in QUADRANT_CELLS ]
+QUADRANT_KEEP = [ FULL & ~sum( 1 << cell for cell in cells ) for cells in QUADRANT_CELLS ]
+ROTATION = [ [ [ sum( 1 << cells[rotatedPosition(p, d)] for p in range(GRID_ELEMENTS) if bits >> p & 1 )
+                 for bits in range(1 << GRID_ELEMENTS) ]
+               for d in range(2) ]
+             for cells in QUADRANT_CELLS ]
+
+
+def quadrant(x, q):
+#---------------------------------------------------------------------------
+# The 9 bits of bitboard x in subgrid q, row by row
+#---------------------------------------------------------------------------
+	s = QUADRANT_SHIFT[q]
+	return (x >> s & 0o7) | (x >> (s+3) & 0o70) | (x >> (s+6) & 0o700)
+
+
+def rotate(x, q, d):
+#---------------------------------------------------------------------------
+# Bitboard x with subgrid q rotated in direction d
+#---------------------------------------------------------------------------
+	s = QUADRANT_SHIFT[q]
+	return (x & QUADRANT_KEEP[q]) | \
+	       ROTATION[q][d][(x >> s & 0o7) | (x >> (s+3) & 0o70) | (x >> (s+6) & 0o700)]
+
+
+def rotateCells(cells, gameBlock, direction):
+#---------------------------------------------------------------------------
+# Copy of a list of 36 cell contents, with gameBlock (1..4) rotated in
+# direction ("L" or "R")
+#---------------------------------------------------------------------------
+	cells = list(cells)
+	quadCells = QUADRANT_CELLS[gameBlock-1]
+	old = [ cells[cell] for cell in quadCells ]
+	for p in range(GRID_ELEMENTS):
+		cells[quadCells[rotatedPosition(p, DIRECTION[direction])]] = old[p]
+	return cells
+
+
+def formatBoard(cells):
+#---------------------------------------------------------------------------
+# The 36 cell contents, row by row, drawn as a grid of 4 subgrids
+#---------------------------------------------------------------------------
+	outstr = "+-------+-------+\n"
+	for offset in range(0,BOARD_SIZE,GRID_SIZE):
+		for i in range(0+offset,GRID_SIZE+offset):
+			row = [ str(cells[BOARD_SIZE*i + j]) for j in range(BOARD_SIZE) ]
+			outstr += "| " + " ".join(row[:GRID_SIZE]) + " | " + " ".join(row[GRID_SIZE:]) + " |\n"
+		outstr += "+-------+-------+\n"
+	return outstr
+
+
+#-----------------------------------------------------------------------
+# MOVE_CODES[move]  : (bit of the cell, cell, subgrid 0..3, direction 0..1)
+#                     of each move "b/n gD" (D in either case)
+# CELL_MOVES[cell]  : the 8 moves placing a marble in cell, in the order
+#                     getMoves lists them
+#-----------------------------------------------------------------------
+def moveTables():
+	moveCodes = { }
+	cellMoves = [ [] for cell in range(NUM_CELLS) ]
+	for gameBlock in range(1, NUM_BLOCKS+1):
+		for position in range(1, GRID_ELEMENTS+1):
+			cell = cellIndex(gameBlock, position)
+			for k in range(NUM_BLOCKS):
+				for direction in "LR":
+					move = str(gameBlock) + "/" + str(position) + " " + str(k+1) + direction
+					cellMoves[cell].append(move)
+					moveCodes[move] = moveCodes[move[:5] + direction.lower()] = \
+					  (1 << cell, cell, k, DIRECTION[direction])
+	return moveCodes, cellMoves
+
+MOVE_CODES, CELL_MOVES = moveTables()
+
+
+#-----------------------------------------------------------------------
+# LINES: masks of the 32 five-in-a-row windows of the board (12 in rows,
+# 12 in columns, 8 on diagonals).  A color has five in a row if its
+# bitboard covers any of them.
+# LINE_STARTS: the same windows grouped by direction, as (step, starts):
+# the bit step from one cell of a window to the next (1, 6, 7 or 5), and
+# the mask of the first cells of the windows in that direction.  Testing
+# x & x>>step & ... & x>>4*step against starts tests all the windows of a
+# direction at once.
+#-----------------------------------------------------------------------
+WIN_LENGTH = 5
+
+def lineMasks():
+	masks = [ ]
+	for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+		for i in range(BOARD_SIZE):
+			for j in range(BOARD_SIZE):
+				cells = [ (i + k*di, j + k*dj) for k in range(WIN_LENGTH) ]
+				if all( 0 <= m < BOARD_SIZE and 0 <= n < BOARD_SIZE for m, n in cells ):
+					masks.append(sum( 1 << (BOARD_SIZE*m + n) for m, n in cells ))
+	return masks
+
+def lineStarts(lines):
+	starts = { }
+	for line in lines:
+		first = line & -line
+		step = ((line ^ first) & -(line ^ first)).bit_length() - first.bit_length()
+		starts[step] = starts.get(step, 0) | first
+	return tuple(starts.items())
+
+LINES = lineMasks()
+LINE_STARTS = lineStarts(LINES)
+
+#-----------------------------------------------------------------------
+# Heuristic evaluation (see Player.pb576_h):
+#  LINE_WEIGHTS[n] : worth of a window holding n marbles of one color and
+#                    none of the other (5 is a win, scored by the search)
+#  CENTERS         : the middle cells of the 4 subgrids, which no rotation
+#                    moves, each worth CENTER_WEIGHT
+#-----------------------------------------------------------------------
+LINE_WEIGHTS = (0, 1, 4, 16, 64, 0)
+CENTERS = sum( 1 << cells[GRID_ELEMENTS//2] for cells in QUADRANT_CELLS )
+CENTER_WEIGHT = 2
+
+DEFAULT_SECONDS = 5.0
+
+#-----------------------------------------------------------------------
+# Outcomes of a board other than a single winner's token ("b" or "w")
+#-----------------------------------------------------------------------
+BOTH = "both"   # both colors have five in a row
+DRAW = "draw"   # board full, no five in a row
+
+
+def fiveInRow(x):
+#---------------------------------------------------------------------------
+# True if bitboard x covers one of the LINES
+#---------------------------------------------------------------------------
+	for step, starts in LINE_STARTS:
+		pairs = x & x >> step
+		if pairs & pairs >> 2*step & x >> 4*step & starts:
+			return True
+	return False
+
+
+#-----------------------------------------------------------------------
+# Zobrist hashing:
+#  A board's key is the XOR of a random 64-bit number for each occupied
+#  (color, cell), so a placement XORs in one number.  A rotation changes
+#  the 9 cells of one subgrid; ZOBRIST_ROTATION[c][q][d][bits] is the XOR of
+#  the numbers of color c's cells of subgrid q (read off as bits, see
+#  quadrant) before and after rotating it in direction d.
+#  TURN_KEYS are XORed in by the search to tell apart the same board with
+#  either color to move.
+#-----------------------------------------------------------------------
+COLOR = { "b": 0, "w": 1 }
+
+def zobristTables(seed=0):
+	rng = random.Random(seed)
+	cellKeys = [ [ rng.getrandbits(64) for cell in range(NUM_CELLS) ] for c in range(2) ]
+	rotationKeys = [ ]
+	for keys in cellKeys:
+		rotationKeys.append([ ])
+		for q, cells in enumerate(QUADRANT_CELLS):
+			rotationKeys[-1].append([ ])
+			for d in range(2):
+				table = [ ]
+				for bits in range(1 << GRID_ELEMENTS):
+					key = 0
+					for p in range(GRID_ELEMENTS):
+						if bits >> p & 1:
+							key ^= keys[cells[p]] ^ keys[cells[rotatedPosition(p, d)]]
+					table.append(key)
+				rotationKeys[-1][-1].append(table)
+	turnKeys = { token: rng.getrandbits(64) for token in COLOR }
+	return cellKeys, rotationKeys, turnKeys
+
+ZOBRIST, ZOBRIST_ROTATION, TURN_KEYS = zobristTables()
+
+
+def zobristKey(black, white):
+#---------------------------------------------------------------------------
+# Key of a board, from scratch
+#---------------------------------------------------------------------------
+	key = 0
+	for c, x in enumerate((black, white)):
+		for cell in range(NUM_CELLS):
+			if x >> cell & 1:
+				key ^= ZOBRIST[c][cell]
+	return key
+
+
+#-----------------------------------------------------------------------
+# Symmetries:
+#  The 8 symmetries of the square (4 rotations, 4 reflections) map subgrids
+#  to subgrids, so they map moves to moves: a reflection turns a rotation
+#  Left into a rotation Right.  Boards that are images of each other have
+#  the same value, so the search treats them as one position.
+#  SYMMETRY_CELL[s][cell]      : image of cell under symmetry s
+#  SYMMETRY_QUADRANT[s][q]     : image of subgrid q (0..3)
+#  INVERSE_SYMMETRY[s]         : the symmetry undoing s
+#  MOVE_SYMMETRY[s][move]      : image of move
+#  SYMMETRY_CHUNKS[s][k][bits] : image of the board bits of cells 12k..12k+11
+#                                set in bits (a 12-bit number)
+#  ZOBRIST_CHUNKS[s]           : 6 tables, 3 per color like SYMMETRY_CHUNKS,
+#                                of the Zobrist numbers of the image cells
+#-----------------------------------------------------------------------
+CHUNK_BITS = 12
+CHUNKS = NUM_CELLS // CHUNK_BITS
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+CANONICAL_STONES = 12   # boards with no more marbles are searched by canonicalKey
+
+LAST = BOARD_SIZE - 1
+SYMMETRIES = [ lambda i, j: (i, j), lambda i, j: (j, LAST-i), lambda i, j: (LAST-i, LAST-j),
+               lambda i, j: (LAST-j, i), lambda i, j: (i, LAST-j), lambda i, j: (LAST-i, j),
+               lambda i, j: (j, i), lambda i, j: (LAST-j, LAST-i) ]
+REFLECTIONS = 4   # symmetries from SYMMETRIES[4] on are reflections
+
+def symmetryTables():
+	cellMaps = [ [ BOARD_SIZE*i + j for i, j in (f(*divmod(cell, BOARD_SIZE)) for cell in range(NUM_CELLS)) ]
+	             for f in SYMMETRIES ]
+	quadrantMaps = [ [ next( r for r, cells in enumerate(QUADRANT_CELLS) if cellMap[QUADRANT_CELLS[q][0]] in cells )
+	                   for q in range(NUM_BLOCKS) ]
+	                 for cellMap in cellMaps ]
+	inverses = [ next( t for t, other in enumerate(cellMaps) if all( other[cellMap[cell]] == cell for cell in range(NUM_CELLS) ) )
+	             for cellMap in cellMaps ]
+	moveMaps = [ ]
+	for s, (cellMap, quadrantMap) in enumerate(zip(cellMaps, quadrantMaps)):
+		moveMap = { }
+		for move, (bit, cell, q, d) in MOVE_CODES.items():
+			if move[5] in "LR":
+				moveMap[move] = CELL_MOVES[cellMap[cell]][2*quadrantMap[q] + (1-d if s >= REFLECTIONS else d)]
+		moveMaps.append(moveMap)
+	return cellMaps, quadrantMaps, inverses, moveMaps
+
+SYMMETRY_CELL, SYMMETRY_QUADRANT, INVERSE_SYMMETRY, MOVE_SYMMETRY = symmetryTables()
+
+
+def chunkTable(values):
+#---------------------------------------------------------------------------
+# XOR of values[p] over the bits p set in each 12-bit number
+#---------------------------------------------------------------------------
+	table = [ 0 ]
+	for value in values:
+		table += [ x ^ value for x in table ]
+	return table
+
+SYMMETRY_CHUNKS = [ [ chunkTable([ 1 << cellMap[cell] for cell in range(k*CHUNK_BITS, (k+1)*CHUNK_BITS) ])
+                      for k in range(CHUNKS) ]
+                    for cellMap in SYMMETRY_CELL ]
+ZOBRIST_CHUNKS = [ tuple( chunkTable([ ZOBRIST[c][cellMap[cell]] for cell in range(k*CHUNK_BITS, (k+1)*CHUNK_BITS) ])
+                          for c in range(2) for k in range(CHUNKS) )
+                   for cellMap in SYMMETRY_CELL ]
+
+
 #--------------------------------------------------------------------------------
 
 class PentagoBoard:
@@ -201,6 +505,9 @@ class PentagoBoard:
 # apply a move
 #--------------------------------------------------------------------------------
 
+	BOARD_SIZE = BOARD_SIZE
+	GRID_SIZE = GRID_SIZE
+	GRID_ELEMENTS = GRID_ELEMENTS
 
 	def __init__ (self,board=""):
 	#---------------------------------------------------------------------------
@@ -208,67 +515,111 @@ class PentagoBoard:
 	# rows of a Pentago Board, e.g., "w.b.bw.w.b.wb.w..wb....w...bw.bbb.ww"
 	# Otherwise, the board is empty.
 	#---------------------------------------------------------------------------
-		self.BOARD_SIZE = 6
-		self.GRID_SIZE = 3
-		self.GRID_ELEMENTS = self.GRID_SIZE * self.GRID_SIZE
-
-		if board=="":
-			self.board = [['.' for col in range(self.BOARD_SIZE)] \
-			                   for row in range(self.BOARD_SIZE)]
-			self.emptyCells = self.BOARD_SIZE**2
-			                   
-		else:
-			self.board = [[board[row*self.BOARD_SIZE + col] \
-			  for col in range(self.BOARD_SIZE)] \
-			  for row in range(self.BOARD_SIZE)] 
-			self.emptyCells = board.count(".")
+		self.black = 0
+		self.white = 0
+		for cell, item in enumerate(board[:NUM_CELLS]):
+			if item == "b":
+				self.black |= 1 << cell
+			elif item == "w":
+				self.white |= 1 << cell
+		self.emptyCells = NUM_CELLS - bin(self.black | self.white).count("1")
+		self.key = zobristKey(self.black, self.white)
+
+
+	def child(self, black, white, emptyCells, key):
+	#---------------------------------------------------------------------------
+	# New board with the given bitboards and key, without parsing a string
+	#---------------------------------------------------------------------------
+		newBoard = PentagoBoard.__new__(PentagoBoard)
+		newBoard.black = black
+		newBoard.white = white
+		newBoard.emptyCells = emptyCells
+		newBoard.key = key
+		return newBoard
 
 
 	def __str__ (self):
-		outstr = "+-------+-------+\n"
-		for offset in range(0,self.BOARD_SIZE,self.GRID_SIZE):
-			for i in range(0+offset,self.GRID_SIZE+offset):
-				outstr += "| "
-				for j in range(0,self.GRID_SIZE):
-					outstr += str(self.board[i][j]) + " "
-				outstr += "| "
-				for j in range(self.GRID_SIZE,self.BOARD_SIZE):
-					outstr += str(self.board[i][j]) + " "
-				outstr += "|\n"
-			outstr += "+-------+-------+\n"
-		
-		return outstr
+		return formatBoard(self.toString())
+
+
+	def outcome(self):
+	#---------------------------------------------------------------------------
+	# Result of the game on this board, for both colors at once: the token
+	# of the only color with five in a row, BOTH if both have it, DRAW if the
+	# board is full without one, and None if play goes on.
+	#---------------------------------------------------------------------------
+		blackWins = fiveInRow(self.black)
+		whiteWins = fiveInRow(self.white)
+		if blackWins:
+			return BOTH if whiteWins else "b"
+		if whiteWins:
+			return "w"
+		if self.emptyCells == 0:
+			return DRAW
+		return None
+
+
+	def canonical(self):
+	#---------------------------------------------------------------------------
+	# (code, s): the smallest of the encodings black<<36 | white of the 8
+	# images of the board, the same for all of them, and the symmetry s
+	# giving it
+	#---------------------------------------------------------------------------
+		black, white = self.black, self.white
+		b0, b1, b2 = black & CHUNK_MASK, black >> CHUNK_BITS & CHUNK_MASK, black >> 2*CHUNK_BITS
+		w0, w1, w2 = white & CHUNK_MASK, white >> CHUNK_BITS & CHUNK_MASK, white >> 2*CHUNK_BITS
+		best = None
+		for s, (t0, t1, t2) in enumerate(SYMMETRY_CHUNKS):
+			code = (t0[b0] | t1[b1] | t2[b2]) << NUM_CELLS | t0[w0] | t1[w1] | t2[w2]
+			if best is None or code < best:
+				best, bestS = code, s
+		return best, bestS
+
+
+	def canonicalKey(self):
+	#---------------------------------------------------------------------------
+	# (key, s): the smallest of the Zobrist keys of the 8 images of the
+	# board, and the symmetry s giving it
+	#---------------------------------------------------------------------------
+		black, white = self.black, self.white
+		b0, b1, b2 = black & CHUNK_MASK, black >> CHUNK_BITS & CHUNK_MASK, black >> 2*CHUNK_BITS
+		w0, w1, w2 = white & CHUNK_MASK, white >> CHUNK_BITS & CHUNK_MASK, white >> 2*CHUNK_BITS
+		best = None
+		for s, (t0, t1, t2, t3, t4, t5) in enumerate(ZOBRIST_CHUNKS):
+			key = t0[b0] ^ t1[b1] ^ t2[b2] ^ t3[w0] ^ t4[w1] ^ t5[w2]
+			if best is None or key < best:
+				best, bestS = key, s
+		return best, bestS
+
+
+	@property
+	def board(self):
+	#---------------------------------------------------------------------------
+	# The board as a 6x6 matrix of 'b', 'w' and '.' (a copy; changing it does
+	# not change the board)
+	#---------------------------------------------------------------------------
+		cells = self.toString()
+		return [ list(cells[row*BOARD_SIZE:(row+1)*BOARD_SIZE]) for row in range(BOARD_SIZE) ]
 
 
 	def toString(self):
-		return "".join(item for row in self.board for item in row) 
+		black, white = self.black, self.white
+		return "".join( "b" if black >> cell & 1 else "w" if white >> cell & 1 else "." \
+		                for cell in range(NUM_CELLS) )
 
 
 	def getMoves(self):
 	#---------------------------------------------------------------------------
 	# Determines all legal moves for player with current board,
-	# and returns them in moveList.
+	# and returns them in moveList: for each empty cell, row by row, a token
+	# can be placed there and any block rotated either left or right.
 	#---------------------------------------------------------------------------
 		moveList = [ ]
-		for i in range(self.BOARD_SIZE):
-			for j in range(self.BOARD_SIZE):
-				if self.board[i][j] == ".":
-				#---------------------------------------------------------------
-				#  For each empty cell on the grid, determine its block (1..4)
-				#  and position (1..9)  (1..GRID_SIZE^2)
-				#---------------------------------------------------------------
-					gameBlock = (i // self.GRID_SIZE)*2 + (j // self.GRID_SIZE) + 1
-					position  = (i%self.GRID_SIZE)*self.GRID_SIZE + (j%self.GRID_SIZE) + 1
-					pos = str(gameBlock) + "/" + str(position) + " "
-				#---------------------------------------------------------------
-				#  For each block, can place a token in the given cell and
-				#  rotate the block either left or right.
-				#---------------------------------------------------------------
-					numBlocks = (self.BOARD_SIZE // self.GRID_SIZE)**2  # =4 
-					for k in range(numBlocks):  
-						block = str(k+1)
-						moveList.append(pos+block+"L")
-						moveList.append(pos+block+"R")
+		empty = FULL & ~(self.black | self.white)
+		while empty:
+			bit = empty & -empty
+			moveList += CELL_MOVES[bit.bit_length() - 1]
+			empty ^= bit
 
 		return moveList
 
@@ -276,54 +627,108 @@ class PentagoBoard:
 	#---------------------------------------------------------------------------
 	# Rotate gameBlock counter-clockwise.  gameBlock is in [1..4].
 	#---------------------------------------------------------------------------
-		rotLeft = copy.deepcopy(self)
-
-		rowOffset = ((gameBlock-1)//2)*self.GRID_SIZE
-		colOffset = ((gameBlock-1)%2)*self.GRID_SIZE
-		for i in range(0+rowOffset,self.GRID_SIZE+rowOffset):
-			for j in range(0+colOffset,self.GRID_SIZE+colOffset):
-				rotLeft.board[2-j+rowOffset+colOffset][i-rowOffset+colOffset] = self.board[i][j]
-
-		return rotLeft
+		return self.rotated(self.black, self.white, self.emptyCells, self.key, gameBlock-1, 0)
 
 
 	def rotateRight(self,gameBlock):
 	#---------------------------------------------------------------------------
 	# Rotate gameBlock clockwise.  gameBlock is in [1..4].
 	#---------------------------------------------------------------------------
-		rotRight = copy.deepcopy(self)
+		return self.rotated(self.black, self.white, self.emptyCells, self.key, gameBlock-1, 1)
 
-		rowOffset = ((gameBlock-1)//2)*self.GRID_SIZE
-		colOffset = ((gameBlock-1)%2)*self.GRID_SIZE
-		for i in range(0+rowOffset,self.GRID_SIZE+rowOffset):
-			for j in range(0+colOffset,self.GRID_SIZE+colOffset):
-				rotRight.board[j+rowOffset-colOffset][2-i+rowOffset+colOffset] = self.board[i][j]
 
-		return rotRight
+	def rotated(self, black, white, emptyCells, key, q, d):
+	#---------------------------------------------------------------------------
+	# New board from the given one with subgrid q rotated in direction d,
+	# updating the key from the cells of the subgrid before and after
+	#---------------------------------------------------------------------------
+		blackBits, whiteBits = quadrant(black, q), quadrant(white, q)
+		rotation, keep = ROTATION[q][d], QUADRANT_KEEP[q]
+		return self.child((black & keep) | rotation[blackBits], (white & keep) | rotation[whiteBits],
+		                  emptyCells, key ^ ZOBRIST_ROTATION[0][q][d][blackBits]
+		                              ^ ZOBRIST_ROTATION[1][q][d][whiteBits])
 
 
 	def applyMove(self, move, token):
 	#---------------------------------------------------------------------------
-	# Perform the given move, and update board.
+	# Perform the given move, and return the new board.
 	#---------------------------------------------------------------------------
+		bit, cell, q, d = MOVE_CODES[move]
+		black, white = self.black, self.white
+		if token == "b":
+			black |= bit
+			key = self.key ^ ZOBRIST[0][cell]
+		else:
+			white |= bit
+			key = self.key ^ ZOBRIST[1][cell]
+		return self.rotated(black, white, self.emptyCells - 1, key, q, d)
 
-		gameBlock = int(move[0])  # 1,2,3,4
-		position = int(move[2])   # 1,2,3,4,5,6,7,8,9
-		rotBlock = int(move[4])   # 1,2,3,4
-		direction = move[5]       # L,R
 
-		i = (position-1)//self.GRID_SIZE + self.GRID_SIZE*((gameBlock-1)//2) ;
-		j = ((position-1)%self.GRID_SIZE) + self.GRID_SIZE*((gameBlock-1)%2) ;
 
-		newBoard = copy.deepcopy(self)
-		newBoard.board[i][j] = token
-		
-		if( direction=='r' or direction=='R' ):
-			newBoard = newBoard.rotateRight(rotBlock) ;
-		else: # direction=='l' or direction=='L'
-			newBoard = newBoard.rotateLeft(rotBlock) ;
+#--------------------------------------------------------------------------------
 
-		return newBoard
+class TranspositionTable:
+#--------------------------------------------------------------------------------
+# Fixed-size table of search results, indexed by the low bits of a Zobrist
+# key.  Each slot holds one entry
+#   (key, depth, bound, value, move, generation)
+# where bound says whether value is EXACT, or only a LOWER or UPPER bound on
+# the value of the position searched depth plies deep, and move is the best
+# move found.  A new entry replaces the one in its slot if that is from an
+# earlier search (see newSearch), or was searched no deeper.
+# hits, misses and collisions count probes that found the key, an empty
+# slot, and a slot holding another key.
+#--------------------------------------------------------------------------------
+
+	EXACT, LOWER, UPPER = 0, 1, 2
+
+	def __init__(self, size=1 << 20):
+		self.size = 1 << (size - 1).bit_length()   # a power of 2
+		self.mask = self.size - 1
+		self.slots = [ None ] * self.size
+		self.generation = 0
+		self.hits = 0
+		self.misses = 0
+		self.collisions = 0
+		self.stores = 0
+		self.replacements = 0
+
+	def newSearch(self):
+		self.generation += 1
+
+	def probe(self, key):
+		entry = self.slots[key & self.mask]
+		if entry is None:
+			self.misses += 1
+		elif entry[0] == key:
+			self.hits += 1
+			return entry
+		else:
+			self.collisions += 1
+		return None
+
+	def store(self, key, depth, bound, value, move):
+		i = key & self.mask
+		entry = self.slots[i]
+		if entry is None or entry[0] == key or entry[1] <= depth or entry[5] != self.generation:
+			if entry is not None and entry[0] != key:
+				self.replacements += 1
+			self.slots[i] = (key, depth, bound, value, move, self.generation)
+			self.stores += 1
+
+	def stats(self):
+		probes = self.hits + self.misses + self.collisions
+		return { "hits": self.hits, "misses": self.misses, "collisions": self.collisions,
+		         "hit rate": round(self.hits / probes, 3) if probes else None,
+		         "stores": self.stores, "replacements": self.replacements }
+
+
+
+class SearchTimeout(Exception):
+#--------------------------------------------------------------------------------
+# Raised inside the search when the time for the move has run out
+#--------------------------------------------------------------------------------
+	pass
 
 
 
@@ -352,6 +757,20 @@ class Player:
 			 
 		if token.lower() in ["b","w"]:
 			self.token = token.lower()
+			self.opponent = "w" if self.token == "b" else "b"
+
+		#-----------------------------------------------------------------------
+		# Search: seconds miniMax may spend on a move, the plies it may look
+		# ahead at most (None: as far as time allows), the positions it has
+		# already searched (kept from move to move), and the counts of the
+		# last search
+		#-----------------------------------------------------------------------
+		self.seconds = DEFAULT_SECONDS
+		self.maxDepth = None
+		self.table = TranspositionTable()
+		self.deadline = None
+		self.nodes = 0
+		self.searchStats = { }
 			 
 	def __str__ (self):
 		return "Player " + self.name + ": type=" + self.playerType +  \
@@ -387,192 +806,219 @@ class Player:
 
 	def win(self,board):
 	#---------------------------------------------------------------------------
-	# Check for winner beginning with each element.
-	# It is possible that both players have multiple "wins"
-	#---------------------------------------------------------------------------
-		numWins = 0
-		for i in range(board.BOARD_SIZE):
-			for j in range(board.BOARD_SIZE):
-				if board.board[i][j] == self.token:
-					#-----------------------------------------------
-					# win in row starting with board[i][j]
-					#-----------------------------------------------
-					if j<=1:
-						count = 5
-						k = j
-						fiveInRow = True
-						while count>0 and fiveInRow:
-							fiveInRow = ( board.board[i][k]==self.token )
-							k = k + 1
-							count = count - 1
-						if fiveInRow:
-							numWins = numWins + 1
-
-					#-----------------------------------------------
-					# win in col starting with board[i][j]
-					#-----------------------------------------------
-					if i<=1:
-						count = 5
-						k = i
-						fiveInRow = True
-						while count>0 and fiveInRow:
-							fiveInRow = ( board.board[k][j]==self.token )
-							k = k + 1
-							count = count - 1
-						if fiveInRow:
-							numWins = numWins + 1
-
-					#-----------------------------------------------
-					# win in main diag starting with board[i][j]
-					#-----------------------------------------------
-					if i<=1 and j<=1:
-						count = 5
-						m = i
-						n = j
-						fiveInRow = True
-						while count>0 and fiveInRow:
-							fiveInRow = ( board.board[m][n]==self.token )
-							m = m + 1
-							n = n + 1
-							count = count - 1
-						if fiveInRow:
-							numWins = numWins + 1
-
-					#-----------------------------------------------
-					# win in off diag starting with board[i][j]
-					#-----------------------------------------------
-					if i<=1 and j>=4 :
-						count = 5
-						m = i
-						n = j
-						fiveInRow = True
-						while count>0 and fiveInRow:
-							fiveInRow = ( board.board[m][n]==self.token )
-							m = m + 1
-							n = n - 1
-							count = count - 1
-						if fiveInRow:
-							numWins = numWins + 1
-
-		return (numWins>0)
+	# True if player has five in a row on board (the opponent may have too).
+	#---------------------------------------------------------------------------
+		return fiveInRow(board.black if self.token == "b" else board.white)
 		
 	def pb576_h(self, board):
 	#---------------------------------------------------------------------------
-	# Heuristic evaluation of board, presuming it is player's move.
-	# Student code needed here.
-	# Heuristic should not do further lookahead by calling miniMax.  This
-	# function estimates the value of the board at a terminal node.
-	#---------------------------------------------------------------------------
-		boardVal = 0
-		streak = 0
-		boardStr = board.toString()
-		boardMatrix = [[boardStr[row*board.BOARD_SIZE + col] \
-			for col in range(board.BOARD_SIZE)] \
-			for row in range(board.BOARD_SIZE)]
-		for row in boardMatrix:
-			print(row)
-
-		#2 or more consecutive tokens in the horizontal direction
-		for i in range(board.BOARD_SIZE):
-			for j in range(board.BOARD_SIZE-1):
-				if (boardMatrix[i][j] == self.token and boardMatrix[i][j+1] == self.token):
-					boardVal += streak + 1
-					streak += 1
-				else:
-					streak = 0
-		#2 or more consective tokens in the vertical direction
-		for i in range(board.BOARD_SIZE-1):
-			for j in range(board.BOARD_SIZE):
-				if (boardMatrix[i][j] == self.token and boardMatrix[i+1][j] == self.token):
-					boardVal += streak + 1
-					streak += 1
-				else:
-					streak = 0
-		#2 or more consecutive tokens on the main diagonal
-		for i in range(board.BOARD_SIZE-1):
-			if (boardMatrix[i][i] == self.token and boardMatrix[i+1][i+1] == self.token):
-				boardVal += streak + 1
-				streak += 1
-			else:
-				streak = 0
-		#2 or more consecutive tokens on the secondary diagonal
-		for i in range(board.BOARD_SIZE-1):
-			if (boardMatrix[i][5-i] == self.token and boardMatrix[i+1][4-i] == self.token):
-				boardVal += streak + 1
-				streak += 1
-			else:
-				streak = 0
-
-		#check middle positions of each quadrant
-		if(boardMatrix[1][1] == self.token):
-			boardVal += 1
-		if(boardMatrix[1][4] == self.token):
-			boardVal += 1
-		if(boardMatrix[4][1] == self.token):
-			boardVal += 1
-		if(boardMatrix[4][4] == self.token):
-			boardVal += 1
+	# Heuristic evaluation of board for player, without lookahead: for each
+	# five-in-a-row window still open to player (holding none of the
+	# opponent's marbles), the LINE_WEIGHTS of the marbles player has in it,
+	# less the same for the opponent, plus CENTER_WEIGHT for each subgrid
+	# center held, less those the opponent holds.
+	#---------------------------------------------------------------------------
+		if self.token == "b":
+			mine, theirs = board.black, board.white
+		else:
+			mine, theirs = board.white, board.black
+		boardVal = CENTER_WEIGHT * ((mine & CENTERS).bit_count() - (theirs & CENTERS).bit_count())
+		for line in LINES:
+			m = mine & line
+			t = theirs & line
+			if not t:
+				boardVal += LINE_WEIGHTS[m.bit_count()]
+			elif not m:
+				boardVal -= LINE_WEIGHTS[t.bit_count()]
+		return boardVal
 
+	def nodeKey(self, board, token):
+	#---------------------------------------------------------------------------
+	# (key, s): transposition table key of board with token to move, and the
+	# symmetry taking board to the image the entry describes.  Early boards
+	# are keyed by their canonical key, so that all 8 images share an entry;
+	# later ones, where images of each other are rarely both reached, by
+	# their own key, which costs nothing to get.
+	#---------------------------------------------------------------------------
+		if NUM_CELLS - board.emptyCells <= CANONICAL_STONES:
+			key, s = board.canonicalKey()
+		else:
+			key, s = board.key, 0
+		return key ^ TURN_KEYS[token], s
 
-		return boardVal
+	def isWin(self, value):
+		return abs(value) > self.INFINITY - 2*NUM_CELLS
 
-	def maxValue(self, board, depth, alpha, beta):
-		if (self.win(board) or board.emptyCells == 0 or depth > 2):
-			return self.INFINITY - depth, NULL
-		value = -INFINITY
-		movelist = board.getMoves()
-		stateList = []
-		for move in movelist:
-			newBoard = board.applyMove(move, self.token)
-			stateList.append(newBoard)
-			val2, move2 = self.minValue(newBoard, depth+1, alpha, beta)
-			if val2 >= beta:
-				return val2, move
-			alpha = max(alpha, val2)
-		return value, move
-
-	def minValue(self, board, depth, alpha, beta):
-		if (self.win(board) or board.emptyCells == 0 or depth > 2):
-			return self.INFINITY - depth, NULL
-		value = INFINITY
+	def lookup(self, key, s, depth, alpha, beta, ply):
+	#---------------------------------------------------------------------------
+	# (value, move) from the transposition table for the position with the
+	# given key, searched depth plies deep within (alpha, beta), ply plies
+	# from the root.  value is None unless the stored entry settles it; move
+	# is the stored best move, mapped back from the image under s, to be
+	# tried first, or None.
+	#---------------------------------------------------------------------------
+		entry = self.table.probe(key)
+		if entry is None:
+			return None, None
+		storedKey, storedDepth, bound, value, move, generation = entry
+		if self.isWin(value):
+			value = value - ply if value > 0 else value + ply
+		if move is not None and s:
+			move = MOVE_SYMMETRY[INVERSE_SYMMETRY[s]][move]
+		if storedDepth >= depth and (bound == TranspositionTable.EXACT or
+		   bound == TranspositionTable.LOWER and value >= beta or
+		   bound == TranspositionTable.UPPER and value <= alpha):
+			return value, move
+		return None, move
+
+	def remember(self, key, s, depth, alpha, beta, value, move, ply):
+	#---------------------------------------------------------------------------
+	# Store the value found with window (alpha, beta): below it, it is only an
+	# upper bound, above it only a lower bound.  The move is stored as its
+	# image under s, and a win counted from the position rather than the root.
+	#---------------------------------------------------------------------------
+		if value <= alpha:
+			bound = TranspositionTable.UPPER
+		elif value >= beta:
+			bound = TranspositionTable.LOWER
+		else:
+			bound = TranspositionTable.EXACT
+		if move is not None and s:
+			move = MOVE_SYMMETRY[s][move]
+		if self.isWin(value):
+			value = value + ply if value > 0 else value - ply
+		self.table.store(key, depth, bound, value, move)
+
+	def children(self, board, token, hashMove):
+	#---------------------------------------------------------------------------
+	# (move, newBoard) for the moves of token on board, hashMove first,
+	# skipping moves that lead to a board already generated (such as both
+	# rotations of an empty subgrid)
+	#---------------------------------------------------------------------------
 		movelist = board.getMoves()
-		stateList = []
+		if hashMove is not None:
+			movelist.remove(hashMove)
+			movelist.insert(0, hashMove)
+		seen = set()
 		for move in movelist:
-			newBoard = board.applyMove(move, self.token)
-			stateList.append(newBoard)
-			val2, move2 = self.maxValue(newBoard, depth+1, alpha, beta)
-			if val2 <= alpha:
-				return val2, move
-			beta = min(beta, val2)
-		return value, move
-
-
-	def miniMax(self, board, min, depth, maxDepth):
-	#---------------------------------------------------------------------------
-	# Use MiniMax algorithm to determine best move for player to make for given
-	# board.  Return the chosen move and the value of applying the heuristic to
-	# the board.
-	# To examine each of player's moves and evaluate them with no lookahead,
-	# maxDepth should be set to 1.  To examine each of the opponent's moves,
-	#  set maxDepth=2, etc.
-	# Increase depth by 1 on each recursive call to miniMax.
-	# min is the minimum value seen thus far by
-	#
-	# If a win is detected, the value returned should be INFINITY-depth.
-	# This rates 'one move wins' higher than 'two move wins,' etc.  This ensures
-	# that Player moves toward a win, rather than simply toward the assurance of
-	# a win.
-	#
-	# Student code needed here.
-	# Alpha-Beta pruning is recommended for Extra Credit.
-	# Argument list for this function may be altered as needed.
-	#
-	# successive calls to MiniMax should swap the self and opponent arguments.
-	#---------------------------------------------------------------------------
-
-		depth = 0
-		value, move = self.maxValue(board, depth, -INFINITY, INFINITY)
-		return move, value
+			newBoard = board.applyMove(move, token)
+			if newBoard.key not in seen:
+				seen.add(newBoard.key)
+				yield move, newBoard
+
+	def rootMoves(self, board):
+	#---------------------------------------------------------------------------
+	# Player's moves on board, keeping only the first of those whose new
+	# boards are images of each other under a symmetry
+	#---------------------------------------------------------------------------
+		seen = set()
+		moveList = []
+		for move in board.getMoves():
+			code = board.applyMove(move, self.token).canonical()[0]
+			if code not in seen:
+				seen.add(code)
+				moveList.append(move)
+		return moveList
+
+	def negamax(self, board, token, depth, alpha, beta, ply):
+	#---------------------------------------------------------------------------
+	# (value, move): value of board for token, who is to move, searched depth
+	# plies deep with alpha-beta pruning, and the best move found.  A win is
+	# worth INFINITY-ply, ply being the plies from the root, so that nearer
+	# wins rate higher; both players winning at once is a draw (0).  Below
+	# alpha or above beta, value is only a bound on the true value.
+	# Raises SearchTimeout once the deadline has passed.
+	#---------------------------------------------------------------------------
+		self.nodes += 1
+		if self.nodes & 1023 == 0 and self.deadline is not None and time.perf_counter() > self.deadline:
+			raise SearchTimeout
+
+		result = board.outcome()
+		if result is not None:
+			if result == BOTH or result == DRAW:
+				return 0, None
+			return (self.INFINITY - ply if result == token else ply - self.INFINITY), None
+		if depth == 0:
+			boardVal = self.pb576_h(board)
+			return (boardVal if token == self.token else -boardVal), None
+
+		key, s = self.nodeKey(board, token)
+		value, hashMove = self.lookup(key, s, depth, alpha, beta, ply)
+		if value is not None:
+			return value, hashMove
+		other = "w" if token == "b" else "b"
+		alpha0 = alpha
+		value, bestMove = -INFINITY, None
+		for move, newBoard in self.children(board, token, hashMove):
+			val2 = -self.negamax(newBoard, other, depth-1, -beta, -alpha, ply+1)[0]
+			if val2 > value:
+				value, bestMove = val2, move
+				if value >= beta:
+					break
+				if value > alpha:
+					alpha = value
+		self.remember(key, s, depth, alpha0, beta, value, bestMove, ply)
+		return value, bestMove
+
+
+	def searchRoot(self, board, moveList, depth):
+	#---------------------------------------------------------------------------
+	# (value, move): best of player's moves in moveList, searched depth plies
+	# deep in that order
+	#---------------------------------------------------------------------------
+		alpha = -INFINITY
+		value, bestMove = -INFINITY, None
+		for move in moveList:
+			val2 = -self.negamax(board.applyMove(move, self.token), self.opponent,
+			                     depth-1, -INFINITY, -alpha, 1)[0]
+			if val2 > value:
+				value, bestMove = val2, move
+				alpha = max(alpha, value)
+		return value, bestMove
+
+
+	def miniMax(self, board, seconds=None, maxDepth=None):
+	#---------------------------------------------------------------------------
+	# Use iterative deepening alpha-beta (in negamax form) to determine the
+	# best move for player to make for given board.  Return the chosen move
+	# and its value (see negamax).
+	# Searches 1 ply deep, then 2, and so on, until seconds have passed,
+	# maxDepth is reached, the board would be full or a forced result is
+	# found.  A search cut off by the deadline is abandoned, and the move of
+	# the deepest search completed is returned; the first search always
+	# completes.  Each search tries the best move of the one before first,
+	# and the transposition table carries the rest of what was learned.
+	# The counts of the search are left in searchStats.
+	#---------------------------------------------------------------------------
+		start = time.perf_counter()
+		self.table.newSearch()
+		self.nodes = 0
+		self.deadline = None
+
+		moveList = self.rootMoves(board)
+		bestMove, value, depthReached = moveList[0], None, 0
+		lastDepth = board.emptyCells if maxDepth is None else min(maxDepth, board.emptyCells)
+		for depth in range(1, lastDepth+1):
+			try:
+				value, bestMove = self.searchRoot(board, moveList, depth)
+			except SearchTimeout:
+				break
+			depthReached = depth
+			moveList.remove(bestMove)
+			moveList.insert(0, bestMove)
+			if self.isWin(value):
+				break
+			if seconds is not None:
+				self.deadline = start + seconds
+				if time.perf_counter() >= self.deadline:
+					break
+
+		elapsed = time.perf_counter() - start
+		self.deadline = None
+		self.searchStats = { "depth": depthReached, "nodes": self.nodes,
+		                     "seconds": elapsed, "nps": self.nodes / elapsed if elapsed else 0,
+		                     "value": value }
+		return bestMove, value
 
 
 	def getHumanMove(self, board):
@@ -605,11 +1051,14 @@ class Player:
 	def getComputerMove(self, board):
 	#---------------------------------------------------------------------------
 	# If the opponent is a computer, use artificial intelligence to select
-	# the best move.
-	# For this demo, a move is chosen at random from the list of legal moves.
+	# the best move, searching for at most self.seconds, and report how far
+	# the search got.
 	#---------------------------------------------------------------------------
-		opponent = "w" if self.token=="b" else "b"
-		move, value = self.miniMax(board, self.INFINITY, 0, 0)
+		move, value = self.miniMax(board, self.seconds, self.maxDepth)
+		stats = self.searchStats
+		print("Searched %d plies in %.2f s: %d nodes, %d nodes/s, value %s, table hit rate %s" %
+		      (stats["depth"], stats["seconds"], stats["nodes"], stats["nps"], stats["value"],
+		       self.table.stats()["hit rate"]))
 		return move
 
 
@@ -665,6 +1114,9 @@ if __name__ == "__main__":
 #    python3 Pentago_base.py -b "w.b.bw.w.b.wb.w..wb....w...bw.bbb.ww"
 #  This is useful for mid-game testing.
 #
+#  Computer players search each move for 5 seconds; to change that:
+#    python3 Pentago_base.py -t 10
+#
 #  A transcript of the game is produced with name beginning "transcript_" and
 #  ending with a timestamp value.  The file contains player info, followed by
 #  lines containing each state as a 36-character string, followed by the move made.
@@ -688,7 +1140,6 @@ if __name__ == "__main__":
 	gameOver = False
 	currentPlayer = 0
 	print(pb)
-	numEmpty = pb.emptyCells
 	while( not gameOver ):
 		move = player[currentPlayer].playerMove(pb)
 		if move == "exit":
@@ -697,33 +1148,30 @@ if __name__ == "__main__":
 		print(player[currentPlayer].name + "'s move: " + move)
 		f.write(pb.toString() + "\t" + move + "\n")
 		
-		newBoard = copy.deepcopy(pb)
-		newBoard = newBoard.applyMove(move,player[currentPlayer].token)
+		newBoard = pb.applyMove(move,player[currentPlayer].token)
 		
 		player[currentPlayer].explainMove(move) 
 
 		print(newBoard)
-		numEmpty = numEmpty - 1
 
-		win0 = player[0].win(newBoard)
-		win1 = player[1].win(newBoard)
-		gameOver = win0 or win1 or numEmpty==0
+		result = newBoard.outcome()
+		gameOver = result is not None
 
 		currentPlayer = 1 - currentPlayer
-		pb = copy.deepcopy(newBoard)
+		pb = newBoard
 
 	#-----------------------------------------------------------------------
 	# Game is over, determine winner.
 	#-----------------------------------------------------------------------
 	if not gameOver:  # Human player requested "exit"
 		print("Exiting game.")
-	elif (win0 and win1):
+	elif result == BOTH:
 		print("Game ends in a tie (multiple winners).")
-	elif win0:
+	elif result == player[0].token:
 		print(player[0].name + " (" + descr[ player[0].token ] + ") wins")
-	elif win1:
+	elif result == player[1].token:
 		print(player[1].name + " (" + descr[ player[1].token ] + ") wins")
-	elif numEmpty==0:
+	elif result == DRAW:
 		print("Game ends in a tie (no winner).")
 
 	f.write(pb.toString() + "\t\n")
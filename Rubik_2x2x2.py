@@ -1,9 +1,10 @@
-from doctest import IGNORE_EXCEPTION_DETAIL
+import abc
 import random
-import copy
 import sys, getopt
 import time
-import queue
+import heapq
+from array import array
+from operator import itemgetter, ne
 
 def get_arg(index, default=None):
 #============================================================================
@@ -15,15 +16,22 @@ def get_arg(index, default=None):
 def getConfiguration():
 #============================================================================
 # Returns configuration read from command line.
-#   python3 <this program>.py -c arg -m arg -v
+#   python3 <this program>.py -c arg -m arg -s seed -v
 #
 # -c, --config:
 #	Specifies initial state.
 #	  If given as a string, can be either in terse or reader-friendly mode, 
 #	    e.g., "WOWOBBBBRWRWYRYRGGGGYOYO" or "WOWO BBBB RWRW YRYR GGGG YOYO"
+#	    It must be a position that turning faces can reach (see
+#	    Rubik_2x2x2_coord.validate).
 #	  If given as a non-negative integer, specifies the number of random
 #	    legal moves to apply to the goal state to produce initial state.
 #
+# -s, --seed:
+#	Seeds the random number generator used for -c n, so that the same
+#	  initial state is produced on every run.  By default it is seeded from
+#	  the clock.
+#
 # -m, --method:
 #	Specifies solution method to use.
 #	Choices are:
@@ -31,7 +39,9 @@ def getConfiguration():
 #	  "d","depth"       : specifying IT_DEPTH_FIRST (Iterative Deepening Depth-First)
 #	  "a","best"        : specifying BEST_FIRST
 #	  "i","idbacktrack" : specifying IT_BACKTRACK (Iterative Deepening Backtrack)
-#	  "o","other"       : user preference
+#	  "p","pattern"     : specifying PATTERN_DB (optimal, using Rubik_2x2x2_pdb)
+#	  "s","idastar"     : specifying IDA_STAR (optimal, using Rubik_2x2x2_ida)
+#	  "bb","bidirectional" : specifying BIDIRECTIONAL (optimal, using Rubik_2x2x2_bidir)
 #	  n>=0               : specifying DEPTH_FIRST with MAX_DEPTH=n
 #
 # -v, --verbose:
@@ -73,9 +83,11 @@ def getConfiguration():
 	METHOD = { }
 	METHOD.update(dict.fromkeys(["b","breadth"], "BREADTH_FIRST"))
 	METHOD.update(dict.fromkeys(["d","depth"  ], "IT_DEPTH_FIRST"))
-	METHOD.update(dict.fromkeys(["a","best"   ], "B ST"))
+	METHOD.update(dict.fromkeys(["a","best"   ], "BEST_FIRST"))
 	METHOD.update(dict.fromkeys(["i","idbacktrack"], "IT_BACKTRACK"))
-	METHOD.update(dict.fromkeys(["o","other"], "OTHER"))
+	METHOD.update(dict.fromkeys(["p","pattern"], "PATTERN_DB"))
+	METHOD.update(dict.fromkeys(["s","idastar"], "IDA_STAR"))
+	METHOD.update(dict.fromkeys(["bb","bidirectional"], "BIDIRECTIONAL"))
 
 	method = "DEPTH_FIRST"   # default method
 	MAX_DEPTH = 1            # default maximum depth
@@ -83,25 +95,20 @@ def getConfiguration():
 	commandLineErrors = False
 			  
 	goalState = Cube()  # by default, Cube() is the goal state
+	config = goalState.tiles
+	seed = None
 	
-	opts, args= getopt.getopt(sys.argv[1:],"c:m:v",["config=","method=","verbose"])
+	try:
+		opts, args= getopt.getopt(sys.argv[1:],"c:m:s:v",["config=","method=","seed=","verbose"])
+	except getopt.GetoptError as e:
+		print("Command line error, " + str(e))
+		sys.exit()
 	for opt, arg in opts:
 		if opt in ("-c", "--config"):
-			#==============================================================
-			# initialState will either be the given string, or
-			# an integer specifying a random state n moves away from
-			# the goal state
-			#==============================================================
-			initialState = arg
-			if len(arg) < len(goalState.tiles): 
-				#==============================================================
-				# If the argument is not a string sufficiently long to be an
-				# initial state, it is assumed to be a non-negative integer.
-				#==============================================================
-				NUM_STEPS = int(arg)
-				initialState = goalState.shuffle(NUM_STEPS)
-			else:
-				initialState = Cube(arg)
+			config = arg
+			
+		elif opt in ("-s", "--seed"):
+			seed = int(arg)
 			
 		elif opt in ("-m", "--method"):
 			#==============================================================
@@ -112,8 +119,11 @@ def getConfiguration():
 			#==============================================================
 			if arg in METHOD.keys():
 				method = METHOD[arg]
-			else:
+			elif arg.isdigit():
 				MAX_DEPTH = int(arg)  
+			else:
+				print("Unknown method, " + arg)
+				commandLineErrors = True
 				
 		elif opt in ("-v", "--verbose"):
 			VERBOSE = True
@@ -124,6 +134,32 @@ def getConfiguration():
 			
 	if commandLineErrors:
 		sys.exit()
+
+	#==============================================================
+	# initialState will either be the given string, or
+	# an integer specifying a random state n moves away from
+	# the goal state
+	#==============================================================
+	random.seed(seed)  # seed=None uses the clock
+	initialState = config
+	if len(config) < len(goalState.tiles): 
+		#==============================================================
+		# If the argument is not a string sufficiently long to be an
+		# initial state, it is assumed to be a non-negative integer.
+		#==============================================================
+		NUM_STEPS = int(config)
+		initialState = goalState.shuffle(NUM_STEPS)
+	else:
+		#==============================================================
+		# Only positions that turning faces can reach are accepted
+		#==============================================================
+		import Rubik_2x2x2_coord as coord
+		initialState = Cube(config)
+		try:
+			coord.validate(initialState.tiles)
+		except ValueError as e:
+			print("Invalid configuration, " + config + ": " + str(e))
+			sys.exit()
 		 
 	return initialState, method, MAX_DEPTH, VERBOSE
 
@@ -187,28 +223,78 @@ rules:
 [ U , U', R , R', F , F', D , D', L , L', B , B']
 '''
 
+#============================================================================
+# RULES precompiled into gather functions on the packed state.  MOVES[rule]
+# applied to a 24-byte state returns the 24 permuted tile values, i.e.,
+#   bytes(MOVES[rule](state))[i] == state[RULES[rule][i]]
+# so a move costs one C-level call instead of a Python loop.
+#============================================================================
+
+MOVES = { rule: itemgetter(*perm) for rule, perm in RULES.items() }
+
+#============================================================================
+# Stickers each rule moves: the indices where its permutation is not the
+# identity.  Every other sticker keeps its color, so a heuristic summed
+# over stickers only has to look again at these after the rule.
+#============================================================================
+
+TOUCHED = { rule: tuple( i for i, j in enumerate(perm) if i != j ) for rule, perm in RULES.items() }
+
 #--------------------------------------------------------------------------------
 
 class Cube:
 
+	#============================================================================
+	# The state of the cube is packed into a single 24-byte bytes value, one
+	# ASCII color per sticker in the order given by the sticker indices above.
+	# The string forms (tiles, config) are derived from it on demand.
+	# __slots__ keeps each node small when millions of them are expanded.
+	# h caches the heuristic value of the state once it has been computed.
+	#============================================================================
+	__slots__ = ("state", "depth", "rule", "parent", "h")
 
 	def __init__(self, config="WWWW RRRR GGGG YYYY OOOO BBBB"):
 			
 		#============================================================================
-		# This code ensures that tiles is a string without spaces in it, and
-		# string is a more readable version with spaces in it, as in the default
-		# argument.  The user may initialize Cube with a string in either form. 
-		#============================================================================
-		self.tiles = config.replace(" ","")
+		# The user may initialize Cube with a string in either form, with or
+		# without spaces; only the 24 tile colors are stored.
 		#============================================================================
-		# separate tiles into chunks of size 4 and insert a space between them
-		#============================================================================
-		chunks = [self.tiles[i:i+4] + " " for i in range(0, len(self.tiles), 4)]
-		self.config = "".join(chunks)
-		
+		self.state = config.replace(" ","").encode("ascii")
 		self.depth = 0
 		self.rule = ""
 		self.parent = None
+		self.h = None
+
+	@classmethod
+	def fromState(cls, state):
+		#============================================================================
+		# Builds a Cube directly from a packed state, skipping string parsing.
+		#============================================================================
+		cube = cls.__new__(cls)
+		cube.state = state
+		cube.depth = 0
+		cube.rule = ""
+		cube.parent = None
+		cube.h = None
+		return cube
+
+	@property
+	def tiles(self):
+		#============================================================================
+		# tiles is a string without spaces in it, e.g. "WWWWRRRRGGGGYYYYOOOOBBBB"
+		#============================================================================
+		return self.state.decode("ascii")
+
+	@property
+	def config(self):
+		#============================================================================
+		# config is a more readable version of tiles with spaces in it, as in the
+		# default argument: tiles separated into chunks of size 4, each followed
+		# by a space.
+		#============================================================================
+		tiles = self.tiles
+		chunks = [tiles[i:i+4] + " " for i in range(0, len(tiles), 4)]
+		return "".join(chunks)
 
 
 	def __str__(self):
@@ -219,7 +305,16 @@ class Cube:
 
 		
 	def __eq__(self,state):
-		return (self.tiles == state.tiles) or (self.config == state.config)
+		return self.state == state.state
+
+	def __hash__(self):
+		return hash(self.key())
+
+	def key(self):
+		#============================================================================
+		# Hashable canonical form of the state, used to index visited sets.
+		#============================================================================
+		return self.state
 
 	def __lt__(self, state):
 		return calcHeuristic(self) < calcHeuristic(state)
@@ -282,29 +377,111 @@ class Cube:
 		#============================================================================
 		# return new state formed by applying rule to state
 		#============================================================================
-		# your code
-		stateArr = list(self.tiles)
-		tempArr = copy.deepcopy(stateArr)
-		for i in range(0, 24):
-			stateArr[i] = tempArr[RULES[rule][i]]
-		stateStr = "".join(stateArr)
-		newState = Cube(stateStr)
-		return newState 
-
-	def shuffle(self, n):
-		state = copy.deepcopy(self)
-		for i in range(0, n):
-			chosenRule = random.choice(list(RULES))
-			state = state.applyRule(chosenRule)
-			print(chosenRule)
-			print(state)
+		return Cube.fromState(bytes(MOVES[rule](self.state)))
+
+	def shuffle(self, n, rng=random):
+		#============================================================================
+		# return the state reached by applying n random rules (see randomRules)
+		#============================================================================
+		state = self
+		for rule in randomRules(n, rng):
+			state = state.applyRule(rule)
 		return state
 
 	def goal(self):
-		return self.config == goalState.config
+		#============================================================================
+		# True if the cube is solved in any orientation, i.e. is goalState
+		# rotated as a whole: the searches stop at any of these
+		#============================================================================
+		global solvedStates
+		if solvedStates is None:
+			import Rubik_2x2x2_coord as coord
+			solvedStates = frozenset( coord.rotate(goalState.tiles, r).encode("ascii")
+			                          for r in range(len(coord.ROTATIONS)) )
+		return self.state in solvedStates
 
 
 goalState = Cube()
+solvedStates = None  # goalState in each of its 24 orientations, once needed
+
+#--------------------------------------------------------------------------------
+#  EXPANSION POLICY
+#--------------------------------------------------------------------------------
+
+OPPOSITE_FACE = { "U":"D", "D":"U", "R":"L", "L":"R", "F":"B", "B":"F" }
+
+def inverseRule(rule):
+	return rule[:-1] if rule.endswith("'") else rule + "'"
+
+
+class Expansion:
+	#============================================================================
+	# Decides which rules are tried when a node is expanded.  Rules that
+	# cannot lead to a shortest solution, given the rules that produced the
+	# node, are skipped:
+	#   X X'   undoes the last move
+	#   X' X'  is the same as X X
+	#   X X X  is the same as X'
+	#   D U    opposite faces commute, so only the order U D is tried
+	# With fixedCorner, only the U, R and F turns are used.  On a 2x2x2 the
+	# D, L and B turns are the same up to a rotation of the whole cube, so the
+	# root is first rotated to bring its DBL corner home (see orient); every
+	# state reached then stands for all 24 of its rotations.
+	#============================================================================
+
+	def __init__(self, fixedCorner=True):
+		self.fixedCorner = fixedCorner
+		self.rules = [ rule for rule in RULES if not fixedCorner or rule[0] in "URF" ]
+		self.after = { "": self.rules }
+		for last in self.rules:
+			self.after[last] = [ rule for rule in self.rules
+			                     if not self.redundant(last, rule) ]
+
+	@staticmethod
+	def redundant(last, rule):
+		if rule == inverseRule(last):
+			return True
+		if rule == last and rule.endswith("'"):
+			return True
+		return last[0] == OPPOSITE_FACE[rule[0]] and rule[0] in "URF"
+
+	def successors(self, node):
+		rules = self.after[node.rule]
+		if node.parent is not None and node.parent.rule == node.rule:
+			rules = [ rule for rule in rules if rule != node.rule ]
+		return rules
+
+	def orient(self, state):
+		#========================================================================
+		# Returns the cube to start searching from, and a dict translating the
+		# rules applied to it into rules for state as given.
+		#========================================================================
+		if not self.fixedCorner:
+			return state, { rule: rule for rule in RULES }
+		import Rubik_2x2x2_coord as coord
+		r = coord.orientation(state.tiles)
+		return Cube(coord.rotate(state.tiles, r)), coord.ROTATION_RULES[r]
+
+expansion = Expansion()
+
+
+#============================================================================
+# Random rule sequences for scrambling.  All twelve rules are used, but
+# never in a way that Expansion rules out, so n rules never cancel down to
+# an obviously shorter sequence.
+#============================================================================
+scrambling = Expansion(fixedCorner=False)
+
+def randomRules(n, rng=random):
+	rules = []
+	last = ""
+	for i in range(n):
+		choices = scrambling.after[last]
+		if len(rules) >= 2 and rules[-2] == last:
+			choices = [ rule for rule in choices if rule != last ]
+		last = rng.choice(choices)
+		rules.append(last)
+	return rules
 
 #--------------------------------------------------------------------------------
 #  GRAPH SEARCH
@@ -320,109 +497,578 @@ def member(x,L):
 	return x in L
 
 def compare(a,b):
-	s = 0
-	for i in range(0, 24):
-		if a[i] != b[i]:
-			s+=1
-		else:
-			continue
-	return s
+	return sum(map(ne, a, b))
 
 '''
 The Hueristic applied calculates the  number of tiles that are out of position + depth(node). states are added to the open container(priority queue)
 in increasing order of the calculated heuristic value.
+The number of tiles out of position is computed once per state and cached in state.h.
 '''
 
+class Heuristic(abc.ABC):
+	#============================================================================
+	# Estimate of the number of rules from a state to goalState, for
+	# best-first search.  The search calls value() on the packed state of its
+	# root, and update() for every child it keeps, with parent.h already
+	# set, so that a heuristic can work out the child's value from its
+	# parent's instead of from scratch.  A subclass must define value();
+	# one that does not cannot be constructed.
+	#============================================================================
+
+	@abc.abstractmethod
+	def value(self, state):
+		pass
+
+	def update(self, parent, rule, child):
+		return self.value(child.state)
+
+
+class MisplacedTiles(Heuristic):
+	#============================================================================
+	# Number of tiles that differ from goal.  Only the tiles in TOUCHED[rule]
+	# can change, so update() compares those 12 instead of all 24.
+	#============================================================================
+
+	def __init__(self, goal=None):
+		self.goal = goalState.state if goal is None else goal
+
+	def value(self, state):
+		return compare(state, self.goal)
+
+	def update(self, parent, rule, child):
+		goal = self.goal
+		before = parent.state
+		after = child.state
+		h = parent.h
+		for i in TOUCHED[rule]:
+			h += (after[i] != goal[i]) - (before[i] != goal[i])
+		return h
+
+misplacedTiles = MisplacedTiles()
+
+
 def calcHeuristic(state):
-	h = compare(state.config, goalState.config)
-	h += state.depth
-	return h
+	if state.h is None:
+		state.h = misplacedTiles.value(state.state)
+	return state.h + state.depth
+
+#--------------------------------------------------------------------------------
+#  DEPTH-LIMITED SEARCH
+#--------------------------------------------------------------------------------
+
+GODS_NUMBER = 14  # no position needs more quarter turns
+
+class DepthFirst:
+	#============================================================================
+	# Depth-limited depth-first search on packed states, keeping only the
+	# current path:
+	#   rules  : the rules from the root to the current node
+	#   onPath : the states on that path, for cycle checks
+	# Both grow and shrink with the recursion, so memory is O(depth).
+	# iterations records (depth limit, nodes expanded) for each limit tried.
+	#============================================================================
+
+	def __init__(self, limits=None, trace=None):
+		limits = limits or {}
+		self.maxNodes = limits.get("nodes")
+		self.deadline = time.perf_counter() + limits["seconds"] if "seconds" in limits else None
+		self.trace = trace
+		self.rules = []
+		self.onPath = set()
+		self.expanded = 0
+		self.generated = 0
+		self.stopped = False
+		self.iterations = []
+
+	def visit(self, state, limit):
+		#========================================================================
+		# Searches at most limit rules below state.  Returns True once the goal
+		# is found, leaving the rules that reach it in self.rules.
+		#========================================================================
+		if self.trace:
+			self.trace("expand", Cube.fromState(state))
+		if state == goalState.state:
+			return True
+		if limit == 0:
+			return False
+		if ((self.maxNodes is not None and self.expanded >= self.maxNodes) or
+		    (self.deadline is not None and time.perf_counter() > self.deadline)):
+			self.stopped = True
+			return False
+		self.expanded += 1
+		rules = self.rules
+		onPath = self.onPath
+		last = rules[-1] if rules else ""
+		for rule in expansion.after[last]:
+			if rule == last and len(rules) >= 2 and rules[-2] == last:
+				continue  # X X X
+			child = bytes(MOVES[rule](state))
+			self.generated += 1
+			if child in onPath:
+				continue
+			rules.append(rule)
+			onPath.add(child)
+			if self.visit(child, limit - 1):
+				return True
+			rules.pop()
+			onPath.discard(child)
+			if self.stopped:
+				return False
+		return False
+
+	def run(self, root, depths):
+		#========================================================================
+		# Searches from root with each depth limit in turn.  Returns the rules
+		# of the first path found, or None.
+		#========================================================================
+		for limit in depths:
+			before = self.expanded
+			self.onPath = { root }
+			found = self.visit(root, limit)
+			self.iterations.append((limit, self.expanded - before))
+			if found:
+				return self.rules
+			if self.stopped:
+				break
+		return None
+
+	def stats(self):
+		return { "expanded": self.expanded, "generated": self.generated,
+		         "iterations": self.iterations }
+
 
 def deadEnd(state):
+	#============================================================================
+	# True if no solution lies below the packed state; none is known for the
+	# cube, so backtracking prunes only on its path and depth limit
+	#============================================================================
 	return False
 
-path1 = []
+class BackTrack(DepthFirst):
+	#============================================================================
+	# Backtracking: depth-limited depth-first search that also gives up on
+	# dead ends.  Limits, statistics and tracing are those of DepthFirst.
+	#============================================================================
 
+	def visit(self, state, limit):
+		if deadEnd(state):
+			return False
+		return DepthFirst.visit(self, state, limit)
 
-def backTrack(stateList):
-	
-	state = first(stateList)
-	if member(state, rest(stateList)):
-		return "FAILED-1"
-	if deadEnd(state):
-		return "FAILED-2"
-	if state.goal():
-		print("Goal Reached")
-		return None
-	if len(stateList) > 20:
-		return "FAILED-3"
-	if RULES == None:
-		return "FAILED-4"
-	
-	for rule in RULES:
-		newState = state.applyRule(rule)
-		newStateList = copy.deepcopy(stateList)
-		newStateList.insert(0, newState)
-		path = backTrack(newStateList)
-		if path is None:
-			path1.append(rule)
-			return path
-	
-	return "FAILED-5"
 
+#--------------------------------------------------------------------------------
+#  OPEN LIST FOR BEST-FIRST SEARCH
+#--------------------------------------------------------------------------------
+
+class OpenList:
+	#============================================================================
+	# Priority queue of open nodes for best-first search, on a plain heapq
+	# list (no locking).  Heap entries are (f, g, tiebreak, key) tuples, so
+	# equal priorities never fall back to comparing Cubes; the nodes
+	# themselves are held in best, keyed on Cube.key(), with the f-value of
+	# their live heap entry.
+	# Putting a state that is already open with a lower f replaces it: the
+	# old heap entry stays in the heap and is skipped when popped (lazy
+	# deletion), so decrease-key costs one push.
+	#============================================================================
+	__slots__ = ("heap", "best", "counter")
+
+	def __init__(self):
+		self.heap = []
+		self.best = {}
+		self.counter = 0
+
+	def put(self, node):
+		#============================================================================
+		# Returns False if the state is already open with an f at least as low.
+		#============================================================================
+		f = calcHeuristic(node)
+		key = node.key()
+		entry = self.best.get(key)
+		if entry is not None and entry[0] <= f:
+			return False
+		self.best[key] = (f, node)
+		self.counter += 1
+		heapq.heappush(self.heap, (f, node.depth, self.counter, key))
+		return True
+
+	def get(self):
+		while True:
+			f, g, tiebreak, key = heapq.heappop(self.heap)
+			entry = self.best.get(key)
+			if entry is not None and entry[0] == f:
+				del self.best[key]
+				return entry[1]
+
+	def empty(self):
+		return not self.best
+
+	def qsize(self):
+		return len(self.best)
+
+
+#--------------------------------------------------------------------------------
+#  VISITED STATES
+#--------------------------------------------------------------------------------
+
+class Visited:
+	#============================================================================
+	# Keeps track of the states a search has already seen, keyed on
+	# Cube.key(), so that membership costs one hash lookup instead of a scan
+	# of every node generated so far.
+	#   closed : keys of states that have been expanded
+	#   opened : keys of states currently waiting in the open container
+	# A state is admitted to the open container at most once.
+	#============================================================================
+	__slots__ = ("closed", "opened")
+
+	def __init__(self):
+		self.closed = set()
+		self.opened = set()
+
+	def push(self, state):
+		#============================================================================
+		# Records state as open; returns False if it was already open or closed.
+		#============================================================================
+		key = state.key()
+		if key in self.closed or key in self.opened:
+			return False
+		self.opened.add(key)
+		return True
+
+	def close(self, state):
+		key = state.key()
+		self.opened.discard(key)
+		self.closed.add(key)
 
-def search(state, container, heuristic):
-	closed = []
-	root = state
-	if state.goal():
-		print("goal reached")
-		exit()
+
+def search(state, container, heuristic, limits=None, trace=None):
+	#============================================================================
+	# Graph search from state; the container decides the order of expansion.
+	# With a heuristic (see Heuristic), the container is an OpenList, which
+	# takes care of states that are reached again while open.
+	# Returns the rules of the path found (None if the limits were reached or
+	# no path exists) and a dict of statistics.
+	#   limits : optional dict with "nodes" (maximum number of expansions)
+	#            and/or "seconds" (maximum running time); breadth-first
+	#            search also takes "memory" (see layeredSearch), and the
+	#            depth-first methods "depth" (see depthFirstSearch)
+	#   trace  : optional callback, called as trace(event, node) for every
+	#            node expanded ("expand") or generated ("generate")
+	#============================================================================
+	limits = limits or {}
+	maxNodes = limits.get("nodes")
+	deadline = time.perf_counter() + limits["seconds"] if "seconds" in limits else None
+	visited = Visited()
+	root, rules = expansion.orient(state)
+	expanded = 0
+	generated = 0
+	peakOpen = 0
+	path = None
 	if heuristic:
-		container.put((0, root))
+		root.h = heuristic.value(root.state)
 	else:
-		container.put(root)
+		visited.push(root)
+	container.put(root)
 	while (not container.empty()):
-		print("Number of states in Open", container.qsize())
-		if heuristic:
-			node = container.get()[1]
-		else:
-			node = container.get()
-		closed.append(node)
+		node = container.get()
+		visited.close(node)
+		if trace:
+			trace("expand", node)
 		if node.goal():
-			print(node)
-			print("goal reached")
-			print("solution path")
-			while node != root:
-				print(node)
+			path = []
+			while node.parent is not None:
+				path.insert(0, rules[node.rule])
 				node = node.parent
-			print(root)
-			print("--- %s seconds ---" % (time.time() - start_time))
-			exit()
-		for rule in RULES:
+			break
+		if maxNodes is not None and expanded >= maxNodes:
+			break
+		if deadline is not None and time.perf_counter() > deadline:
+			break
+		expanded += 1
+		for rule in expansion.successors(node):
 			newNode = node.applyRule(rule)
-			print(newNode)
-			if not member(newNode, closed):
-				newNode.parent = node
-				newNode.depth = node.depth + 1
-				if heuristic:
-					container.put((calcHeuristic(newNode) ,newNode))
-				else:
-					container.put(newNode)
-			else:
+			generated += 1
+			if trace:
+				trace("generate", newNode)
+			if heuristic:
+				if newNode.key() in visited.closed:
+					continue
+				newNode.h = heuristic.update(node, rule, newNode)
+			elif not visited.push(newNode):
 				continue
+			newNode.parent = node
+			newNode.rule = rule
+			newNode.depth = node.depth + 1
+			container.put(newNode)
+		peakOpen = max(peakOpen, container.qsize())
+	return path, { "expanded": expanded, "generated": generated,
+	               "closed": len(visited.closed), "open": container.qsize(),
+	               "peak open": peakOpen }
+
+
+#--------------------------------------------------------------------------------
+#  COMPACT BREADTH-FIRST SEARCH
+#--------------------------------------------------------------------------------
+
+RULE_NAMES = list(RULES)
+RULE_NUMBER = { rule: i for i, rule in enumerate(RULE_NAMES) }
+
+class NodeStore:
+	#============================================================================
+	# Array-backed table of search nodes, in place of linked Cube objects.
+	# Node i has
+	#   states[24*i:24*i+24] : its packed state
+	#   parents[i]           : the index of its parent (-1 for the root)
+	#   moves[i]             : the number (in RULE_NAMES) of the rule that
+	#                          produced it from its parent
+	#============================================================================
+	__slots__ = ("states", "parents", "moves")
+
+	def __init__(self):
+		self.states = bytearray()
+		self.parents = array("i")
+		self.moves = bytearray()
+
+	def __len__(self):
+		return len(self.moves)
+
+	def add(self, state, parent, rule):
+		self.states += state
+		self.parents.append(parent)
+		self.moves.append(RULE_NUMBER.get(rule, 0))
+		return len(self.moves) - 1
+
+	def state(self, i):
+		return bytes(self.states[24*i:24*i+24])
+
+	def path(self, i):
+		#============================================================================
+		# Rules leading from the root to node i
+		#============================================================================
+		rules = []
+		while self.parents[i] >= 0:
+			rules.append(RULE_NAMES[self.moves[i]])
+			i = self.parents[i]
+		rules.reverse()
+		return rules
+
+
+def layeredSearch(start, limits=None, trace=None):
+	#============================================================================
+	# Breadth-first search, one layer at a time, from the packed state start
+	# to goalState.  Returns the rules of a shortest path (None if the limits
+	# were reached) and a dict of statistics; limits and trace are as for
+	# search().
+	# Every node is kept in a NodeStore until limits["memory"] nodes are
+	# stored.  From the next layer on, new nodes are no longer stored: only
+	# the previous, current and next layers are kept for duplicate
+	# detection (every rule has an inverse, so a child can be in no other
+	# layer), and each node just remembers its ancestor in the last stored
+	# layer.  When the goal is found, the rest of the path is found by
+	# searching again from that ancestor.
+	#============================================================================
+	limits = limits or {}
+	maxNodes = limits.get("nodes")
+	maxStored = limits.get("memory")
+	deadline = time.perf_counter() + limits["seconds"] if "seconds" in limits else None
+	goal = goalState.state
+	store = NodeStore()
+	#============================================================================
+	# Each layer maps a state to (node, rule): its own node in the store, or,
+	# once storing has stopped, that of its ancestor; and its last rule.
+	#============================================================================
+	layer = { start: (store.add(start, -1, ""), "") }
+	previous = {}
+	seen = set(layer)
+	storing = True
+	expanded = 0
+	generated = 0
+	stats = { "peak open": 1 }
+	while layer:
+		for state, (node, last) in layer.items():
+			if state == goal:
+				path = store.path(node)
+				if not storing:
+					rest, more = layeredSearch(store.state(node), limits, trace)
+					path += rest
+					expanded += more["expanded"]
+					generated += more["generated"]
+				stats.update(expanded=expanded, generated=generated, stored=len(store))
+				return path, stats
+		if maxNodes is not None and expanded >= maxNodes:
+			break
+		if deadline is not None and time.perf_counter() > deadline:
+			break
+		if storing and maxStored is not None and len(store) >= maxStored and store.parents[-1] >= 0:
+			storing = False
+			seen = None
+			stats["memory cap at depth"] = len(store.path(len(store) - 1))
+		nextLayer = {}
+		for state, (node, last) in layer.items():
+			expanded += 1
+			if trace:
+				trace("expand", Cube.fromState(state))
+			for rule in expansion.after[last]:
+				child = bytes(MOVES[rule](state))
+				generated += 1
+				if storing:
+					if child in seen:
+						continue
+					seen.add(child)
+					nextLayer[child] = (store.add(child, node, rule), rule)
+				elif child not in nextLayer and child not in layer and child not in previous:
+					nextLayer[child] = (node, rule)
+				if trace:
+					trace("generate", Cube.fromState(child))
+		previous, layer = layer, nextLayer
+		stats["peak open"] = max(stats["peak open"], len(layer))
+	stats.update(expanded=expanded, generated=generated, stored=len(store))
+	return None, stats
 
 
 #--------------------------------------------------------------------------------
 #  MAIN PROGRAM
 #--------------------------------------------------------------------------------
-def depthFirstSearch(state):
-	search(state, queue.LifoQueue(), False)
+def depthFirstSearch(state, limits=None, trace=None):
+	#============================================================================
+	# Depth-first search to a depth of limits["depth"] (GODS_NUMBER if absent)
+	#============================================================================
+	maxDepth = (limits or {}).get("depth", GODS_NUMBER)
+	return depthFirst(state, [maxDepth], limits, trace)
 
-def breadthFirstSearch(state):
-	search(state, queue.Queue(), False)
+def iterativeDeepeningSearch(state, limits=None, trace=None):
+	#============================================================================
+	# Depth-first search to depth 0, 1, 2, ... up to limits["depth"]
+	# (GODS_NUMBER if absent); the first solution found is a shortest one.
+	#============================================================================
+	maxDepth = (limits or {}).get("depth", GODS_NUMBER)
+	return depthFirst(state, range(maxDepth + 1), limits, trace)
+
+def depthFirst(state, depths, limits, trace):
+	root, rules = expansion.orient(state)
+	dfs = DepthFirst(limits, trace)
+	path = dfs.run(root.state, depths)
+	if path is not None:
+		path = [ rules[rule] for rule in path ]
+	return path, dfs.stats()
+
+def breadthFirstSearch(state, limits=None, trace=None):
+	root, rules = expansion.orient(state)
+	path, stats = layeredSearch(root.state, limits, trace)
+	if path is not None:
+		path = [ rules[rule] for rule in path ]
+	return path, stats
+
+def bestFirstSearch(state, limits=None, trace=None, heuristic=None):
+	return search(state, OpenList(), heuristic or misplacedTiles, limits, trace)
+
+def backTrackSearch(state, limits=None, trace=None):
+	#============================================================================
+	# Backtracking with a path limit of 0, 1, 2, ... up to limits["depth"]
+	# (GODS_NUMBER if absent)
+	#============================================================================
+	root, rules = expansion.orient(state)
+	maxDepth = (limits or {}).get("depth", GODS_NUMBER)
+	search = BackTrack(limits, trace)
+	path = search.run(root.state, range(maxDepth + 1))
+	if path is not None:
+		path = [ rules[rule] for rule in path ]
+	return path, search.stats()
+
+
+#--------------------------------------------------------------------------------
+#  SOLVER API
+#--------------------------------------------------------------------------------
+
+class Solution:
+	#============================================================================
+	# Result of solve():
+	#   method : the method used
+	#   moves  : rules that solve the cube as given, or None if no solution
+	#            was found within the limits
+	#   states : the cube as given, followed by the state after each move
+	#   stats  : statistics reported by the method, plus its running time
+	#============================================================================
+	__slots__ = ("method", "moves", "states", "stats")
+
+	def __init__(self, cube, method, moves, stats):
+		self.method = method
+		self.moves = moves
+		self.stats = stats
+		self.states = [cube]
+		for rule in moves or []:
+			self.states.append(self.states[-1].applyRule(rule))
+
+	def __str__(self):
+		if self.moves is None:
+			outstr = "no solution found\n"
+		else:
+			outstr = "solution path\n"
+			for state in self.states:
+				outstr += str(state) + "\n"
+			outstr += " ".join(self.moves) + " (%d moves)\n" % len(self.moves)
+		for name, value in self.stats.items():
+			outstr += "%s: %s\n" % (name, value)
+		return outstr
+
+
+#============================================================================
+# Methods whose solutions are always shortest, and so may fill a cache
+#============================================================================
+OPTIMAL_METHODS = ("BREADTH_FIRST", "PATTERN_DB", "IDA_STAR", "BIDIRECTIONAL")
+
+def solve(cube, method="BREADTH_FIRST", limits=None, trace=None, cache=None, heuristic=None):
+	#============================================================================
+	# Solves cube with the given method (as named by getConfiguration) and
+	# returns a Solution.  Nothing is printed; trace, if given, receives the
+	# search events of the graph-search methods (see search).
+	# cache, if given, is a Rubik_2x2x2_cache.SolutionCache: it is consulted
+	# before searching, and solutions of OPTIMAL_METHODS are added to it.
+	# heuristic, if given, is the Heuristic guiding BEST_FIRST (by default
+	# misplacedTiles).
+	# Raises ValueError if cube is not a position that turning faces can
+	# reach: no method could solve it, and some would search all they can
+	# reach before giving up.
+	#============================================================================
+	import Rubik_2x2x2_coord as coord
+	coord.validate(cube.tiles)
+	start = time.perf_counter()
+	if cache is not None:
+		moves = cache.get(cube)
+		if moves is not None:
+			stats = { "expanded": 0, "cached": True,
+			          "ms": round((time.perf_counter() - start) * 1000, 3) }
+			return Solution(cube, method, moves, stats)
+	if method == "DEPTH_FIRST":
+		moves, stats = depthFirstSearch(cube, limits, trace)
+	elif method == "IT_DEPTH_FIRST":
+		moves, stats = iterativeDeepeningSearch(cube, limits, trace)
+	elif method == "BREADTH_FIRST":
+		moves, stats = breadthFirstSearch(cube, limits, trace)
+	elif method == "BEST_FIRST":
+		moves, stats = bestFirstSearch(cube, limits, trace, heuristic)
+	elif method == "IT_BACKTRACK":
+		moves, stats = backTrackSearch(cube, limits, trace)
+	elif method == "PATTERN_DB":
+		import Rubik_2x2x2_pdb
+		moves = Rubik_2x2x2_pdb.database().solve(cube)
+		stats = { "expanded": len(moves) }
+	elif method == "IDA_STAR":
+		import Rubik_2x2x2_ida
+		moves, iterations = Rubik_2x2x2_ida.solve(cube)
+		stats = { "expanded": sum(nodes for threshold, nodes in iterations),
+		          "iterations": iterations }
+	elif method == "BIDIRECTIONAL":
+		import Rubik_2x2x2_bidir
+		moves, stats = Rubik_2x2x2_bidir.solve(cube)
+	else:
+		raise ValueError("unknown method " + method)
+	if cache is not None and moves is not None and method in OPTIMAL_METHODS:
+		cache.put(cube, moves)
+	stats["ms"] = round((time.perf_counter() - start) * 1000, 3)
+	return Solution(cube, method, moves, stats)
 
-def bestFirstSearch(state):
-	search(state, queue.PriorityQueue(), True)
 
 start_time = time.time()
 if __name__ == '__main__':
@@ -439,6 +1085,12 @@ if __name__ == '__main__':
 	# See definition of getConfiguration() above for further details, examples.
 	#============================================================================
 
+	#============================================================================
+	# The other Rubik_2x2x2_* modules import this one by name; they share the
+	# copy that is running instead of loading it a second time.
+	#============================================================================
+	sys.modules.setdefault("Rubik_2x2x2", sys.modules[__name__])
+
 	initialState, method, MAX_DEPTH, VERBOSE = getConfiguration()
 			
 	parameter = ""
@@ -451,30 +1103,24 @@ if __name__ == '__main__':
 	print("Verbose mode.\n")
 
 	
-	random.seed() # use clock to randomize RNG
 	print(initialState)
 	print(calcHeuristic(initialState))
 	print(initialState.toGrid())
 
-	if(method == "DEPTH_FIRST"):
-		print("initiating depth first search")
-		depthFirstSearch(initialState)
-	elif(method == "BREADTH_FIRST"):
-		print("initiating breadth first search")
-		breadthFirstSearch(initialState)
-	elif(method == "BEST_FIRST"):
-		print("initiating best first search")
-		bestFirstSearch(initialState)
-	elif(method == "IT_BACKTRACK"):
-		stateList = []
-		print("initiating itterative backtrack")
-		for rule in RULES:
-			state = initialState.applyRule(rule)
-			stateList.append(state)
-		result = backTrack(stateList)
-		print(result)
-
+	trace = None
+	if VERBOSE:
+		def trace(event, node):
+			print(event, node)
 
+	limits = None
+	if method == "DEPTH_FIRST":
+		limits = { "depth": MAX_DEPTH }
 
-		
-
+	print("initiating " + method)
+	try:
+		solution = solve(initialState, method, limits, trace)
+	except ValueError as e:
+		print("Cannot solve, " + str(e))
+		sys.exit()
+	print(solution)
+	print("--- %s seconds ---" % (time.time() - start_time))
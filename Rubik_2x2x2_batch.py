@@ -0,0 +1,111 @@
+#--------------------------------------------------------------------------------
+# Batch solver for the 2x2x2 Rubik's Cube
+#
+# Reads cube configurations, one per line (terse or reader-friendly form, as
+# accepted by Cube), from the given files or from standard input, solves them
+# on all cores and writes one JSON object per line to standard output, in
+# input order:
+#    {"config": ..., "moves": [...], "length": n, "nodes": n, "ms": t}
+# A configuration that is not a valid cube gives {"config": ..., "error": ...}.
+#
+#    python3 Rubik_2x2x2_batch.py [-m method] [-j workers] [-k cachefile] [file ...]
+#
+# -m, --method:
+#	  "p","pattern"       : pattern database descent (default)
+#	  "s","idastar"       : IDA*
+#	  "bb","bidirectional": bidirectional breadth-first search
+#
+# -j, --jobs:
+#	Number of worker processes (default: one per core).
+#
+# -k, --cache:
+#	SQLite solution cache (see Rubik_2x2x2_cache) to consult before solving
+#	and to fill with new solutions.  Cached results report "cached": true.
+#
+# Each worker memory-maps the pattern database once, so all workers share the
+# same read-only pages; the table is built first if it does not exist yet.
+#--------------------------------------------------------------------------------
+
+import sys, getopt
+import json
+import fileinput
+from concurrent.futures import ProcessPoolExecutor
+
+from Rubik_2x2x2 import Cube, solve
+
+METHOD = { }
+METHOD.update(dict.fromkeys(["p","pattern"], "PATTERN_DB"))
+METHOD.update(dict.fromkeys(["s","idastar"], "IDA_STAR"))
+METHOD.update(dict.fromkeys(["bb","bidirectional"], "BIDIRECTIONAL"))
+
+#============================================================================
+# Per-process solver state, set up by initWorker
+#============================================================================
+method = None
+cache = None
+
+
+def initWorker(name, cachePath):
+	global method, cache
+	method = name
+	if cachePath is not None:
+		import Rubik_2x2x2_cache
+		cache = Rubik_2x2x2_cache.SolutionCache(cachePath)
+	if method == "PATTERN_DB":
+		import Rubik_2x2x2_pdb
+		Rubik_2x2x2_pdb.database()
+
+
+def solveLine(config):
+#============================================================================
+# Solves one configuration and returns its result as a JSON string.  Any
+# failure is recorded as an error for the line, so the rest of the file is
+# still solved.
+#============================================================================
+	try:
+		solution = solve(Cube(config), method, cache=cache)
+	except (ValueError, UnicodeEncodeError) as e:
+		return json.dumps({ "config": config, "error": str(e) })
+	except Exception as e:
+		return json.dumps({ "config": config, "error": "%s: %s" % (type(e).__name__, e) })
+	result = { "config": config, "moves": solution.moves,
+	           "length": None if solution.moves is None else len(solution.moves),
+	           "nodes": solution.stats.get("expanded"),
+	           "ms": solution.stats.get("ms") }
+	if solution.moves is None:
+		result["error"] = "no solution found within the limits"
+	if solution.stats.get("cached"):
+		result["cached"] = True
+	return json.dumps(result)
+
+
+def configs(files):
+	for line in fileinput.input(files):
+		line = line.strip()
+		if line:
+			yield line
+
+
+if __name__ == '__main__':
+	name = "PATTERN_DB"
+	jobs = None
+	cachePath = None
+	opts, args = getopt.getopt(sys.argv[1:], "m:j:k:", ["method=", "jobs=", "cache="])
+	for opt, arg in opts:
+		if opt in ("-m", "--method"):
+			name = METHOD[arg]
+		elif opt in ("-j", "--jobs"):
+			jobs = int(arg)
+		elif opt in ("-k", "--cache"):
+			cachePath = arg
+
+	if name == "PATTERN_DB":
+		#========================================================================
+		# Build the table once here rather than racing to build it in each worker
+		#========================================================================
+		import Rubik_2x2x2_pdb
+		Rubik_2x2x2_pdb.load()
+
+	with ProcessPoolExecutor(jobs, initializer=initWorker, initargs=(name, cachePath)) as pool:
+		for result in pool.map(solveLine, configs(args), chunksize=64):
+			print(result, flush=True)
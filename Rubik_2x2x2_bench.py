@@ -0,0 +1,194 @@
+#--------------------------------------------------------------------------------
+# Benchmark of the search methods of Rubik_2x2x2
+#
+# Each method solves the same seeded scrambles, count of them at each optimal
+# distance (see Rubik_2x2x2_scramble.depthScramble), and one row is recorded
+# per solve:
+#   method, depth, config    : what was solved
+#   status                   : "solved", "unsolved" (limits reached),
+#                              "timeout" or "error"
+#   length, optimal, valid   : solution length, whether it equals depth, and
+#                              whether it really leaves every face one color
+#   ms                       : solve time, as reported by solve()
+#   expanded, generated      : node counts reported by the method
+#   peak_open, closed        : largest open list (or layer) and closed set
+#   peak_rss_kb              : peak resident set size of the solving process
+#   error                    : the exception raised, if any
+# Every solve runs in a process of its own, so that peak_rss_kb is that of the
+# one solve and a runaway search can be stopped.  The report is written as CSV,
+# or as JSON if the output file name ends in ".json", with rows in a fixed
+# order so that reports of two versions can be diffed.
+#
+#    python3 Rubik_2x2x2_bench.py [-m methods] [-d depths] [-n count] [-s seed]
+#                                 [-t seconds] [-o report]
+#
+# -m, --methods:
+#	Comma-separated methods, named as for Rubik_2x2x2 -m (default: all).
+#
+# -d, --depths:
+#	Comma-separated depths or ranges, e.g. "1-7,10" (default: 1-14).
+#
+# -n, --count:
+#	Scrambles per depth (default 3).
+#
+# -s, --seed:
+#	Seed of the scramble sets (default 0).
+#
+# -t, --seconds:
+#	Time limit per solve (default 10).
+#
+# -o, --output:
+#	Report file (default: CSV on standard output).
+#--------------------------------------------------------------------------------
+
+import sys, getopt
+import csv
+import json
+import resource
+import multiprocessing
+
+from Rubik_2x2x2 import Cube, solve
+import Rubik_2x2x2_scramble
+
+METHOD = { }
+METHOD.update(dict.fromkeys(["b","breadth"], "BREADTH_FIRST"))
+METHOD.update(dict.fromkeys(["d","depth"], "IT_DEPTH_FIRST"))
+METHOD.update(dict.fromkeys(["a","best"], "BEST_FIRST"))
+METHOD.update(dict.fromkeys(["i","idbacktrack"], "IT_BACKTRACK"))
+METHOD.update(dict.fromkeys(["f","fixed"], "DEPTH_FIRST"))
+METHOD.update(dict.fromkeys(["p","pattern"], "PATTERN_DB"))
+METHOD.update(dict.fromkeys(["s","idastar"], "IDA_STAR"))
+METHOD.update(dict.fromkeys(["bb","bidirectional"], "BIDIRECTIONAL"))
+
+ALL_METHODS = list(dict.fromkeys(METHOD.values()))
+
+FIELDS = ["method", "depth", "config", "status", "length", "optimal", "valid",
+          "ms", "expanded", "generated", "peak_open", "closed", "peak_rss_kb", "error"]
+
+
+def memory(stats):
+#============================================================================
+# (peak open, closed) from the statistics of any method; the bidirectional
+# search keeps no open list, so both of its reached sets count as closed
+#============================================================================
+	if "forward reached" in stats:
+		return None, stats["forward reached"] + stats["backward reached"]
+	return stats.get("peak open"), stats.get("closed", stats.get("stored"))
+
+
+def run(method, depth, config, limits, conn):
+#============================================================================
+# Solves one scramble in a child process and sends back its row
+#============================================================================
+	row = { "method": method, "depth": depth, "config": config }
+	try:
+		solution = solve(Cube(config), method, limits)
+	except Exception as e:
+		row.update(status="error", error=str(e))
+	else:
+		stats = solution.stats
+		row["status"] = "unsolved" if solution.moves is None else "solved"
+		if solution.moves is not None:
+			row["length"] = len(solution.moves)
+			row["optimal"] = len(solution.moves) == depth
+			row["valid"] = solution.states[-1].goal()
+		row["peak_open"], row["closed"] = memory(stats)
+		row.update(ms=stats["ms"], expanded=stats.get("expanded"),
+		           generated=stats.get("generated"))
+	row["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	conn.send(row)
+	conn.close()
+
+
+def measure(method, depth, config, seconds):
+#============================================================================
+# Row of one solve, stopping the solving process if it overruns the time
+# limit (methods that do not check limits themselves are stopped here)
+#============================================================================
+	receiver, sender = multiprocessing.Pipe(False)
+	process = multiprocessing.Process(target=run,
+		args=(method, depth, config, { "seconds": seconds }, sender))
+	process.start()
+	sender.close()
+	row = None
+	if receiver.poll(seconds + 5):
+		try:
+			row = receiver.recv()
+		except EOFError:
+			pass
+	if process.is_alive():
+		process.terminate()
+	process.join()
+	if row is None:
+		row = { "method": method, "depth": depth, "config": config, "status": "timeout" }
+	return row
+
+
+def benchmark(methods, depths, count, seed, seconds, progress=None):
+#============================================================================
+# Rows of every method on every scramble.  The scrambles of each depth are
+# drawn from their own seed, so adding depths does not change the others.
+#============================================================================
+	scrambles = { depth: list(Rubik_2x2x2_scramble.scrambles(count, seed="%d:%d" % (seed, depth), depth=depth))
+	              for depth in depths }
+	rows = []
+	for method in methods:
+		for depth in depths:
+			for config in scrambles[depth]:
+				row = measure(method, depth, config, seconds)
+				if progress:
+					progress(row)
+				rows.append(row)
+	return rows
+
+
+def parseDepths(arg):
+	depths = []
+	for part in arg.split(","):
+		low, _, high = part.partition("-")
+		depths.extend(range(int(low), int(high or low) + 1))
+	return depths
+
+
+def writeReport(rows, f, asJSON):
+	if asJSON:
+		json.dump(rows, f, indent=1)
+		f.write("\n")
+	else:
+		writer = csv.DictWriter(f, FIELDS)
+		writer.writeheader()
+		writer.writerows(rows)
+
+
+if __name__ == '__main__':
+	methods = ALL_METHODS
+	depths = list(range(1, 15))
+	count = 3
+	seed = 0
+	seconds = 10
+	output = None
+	opts, args = getopt.getopt(sys.argv[1:], "m:d:n:s:t:o:",
+	                           ["methods=", "depths=", "count=", "seed=", "seconds=", "output="])
+	for opt, arg in opts:
+		if opt in ("-m", "--methods"):
+			methods = [ METHOD[name] for name in arg.split(",") ]
+		elif opt in ("-d", "--depths"):
+			depths = parseDepths(arg)
+		elif opt in ("-n", "--count"):
+			count = int(arg)
+		elif opt in ("-s", "--seed"):
+			seed = int(arg)
+		elif opt in ("-t", "--seconds"):
+			seconds = float(arg)
+		elif opt in ("-o", "--output"):
+			output = arg
+
+	def progress(row):
+		print(row["method"], row["depth"], row["status"], row.get("ms"), file=sys.stderr)
+
+	rows = benchmark(methods, depths, count, seed, seconds, progress)
+	if output is None:
+		writeReport(rows, sys.stdout, False)
+	else:
+		with open(output, "w", newline="") as f:
+			writeReport(rows, f, output.endswith(".json"))
@@ -0,0 +1,122 @@
+#--------------------------------------------------------------------------------
+# Bidirectional breadth-first search for the 2x2x2 Rubik's Cube
+#
+# One frontier grows forward from the initial state, the other backward from
+# goalState using the inverse of each rule, until a state generated on one
+# side has already been reached by the other.  A solution of length d then
+# costs two searches of depth about d/2 instead of one of depth d.
+#
+# No tables are needed.  The initial state is rotated as a whole so that its
+# DBL corner is at home (see Rubik_2x2x2_coord); the U, R and F turns then
+# suffice, and the solution is translated back to the cube as given.
+#--------------------------------------------------------------------------------
+
+from Rubik_2x2x2 import MOVES, goalState
+import Rubik_2x2x2_coord as coord
+
+INVERSE = { rule: coord.GENERATORS[m ^ 1] for m, rule in enumerate(coord.GENERATORS) }
+
+
+class Frontier:
+#============================================================================
+# One side of the search.
+#   reached : maps each state seen to (neighbor, rule) linking it one step
+#             closer to this side's root, or None for the root itself
+#   layer   : states at the current (deepest) depth
+#============================================================================
+
+	def __init__(self, root, backward):
+		self.reached = { root: None }
+		self.layer = [root]
+		self.depth = 0
+		self.backward = backward
+		self.expanded = 0
+		self.generated = 0
+
+	def expand(self, other):
+		#========================================================================
+		# Replaces layer with the next one.  Returns the states of the new layer
+		# that the other side has already reached.
+		#========================================================================
+		reached = self.reached
+		meets = []
+		layer = []
+		self.expanded += len(self.layer)
+		for state in self.layer:
+			for rule in coord.GENERATORS:
+				#================================================================
+				# Backward, the rule applied to the child must lead to state
+				#================================================================
+				move = INVERSE[rule] if self.backward else rule
+				child = bytes(MOVES[move](state))
+				self.generated += 1
+				if child in reached:
+					continue
+				reached[child] = (state, rule)
+				layer.append(child)
+				if child in other.reached:
+					meets.append(child)
+		self.layer = layer
+		self.depth += 1
+		return meets
+
+	def rules(self, state):
+		#========================================================================
+		# Rules on the path between state and the root, in the order they are
+		# applied to the cube.
+		#========================================================================
+		path = []
+		while self.reached[state] is not None:
+			state, rule = self.reached[state]
+			path.append(rule)
+		if not self.backward:
+			path.reverse()
+		return path
+
+
+def distance(frontier, state):
+	return len(frontier.rules(state))
+
+
+def search(start, goal):
+#============================================================================
+# Returns the rules of a shortest path from start to goal (packed states),
+# together with both frontiers.  Whole layers are expanded, smaller side
+# first, and the best meeting point of the layer is kept.
+#============================================================================
+	forward = Frontier(start, False)
+	backward = Frontier(goal, True)
+	if start == goal:
+		return [], forward, backward
+	while forward.layer and backward.layer:
+		if len(forward.layer) <= len(backward.layer):
+			side, other = forward, backward
+		else:
+			side, other = backward, forward
+		meets = side.expand(other)
+		if meets:
+			meet = min(meets, key=lambda s: distance(other, s))
+			return forward.rules(meet) + backward.rules(meet), forward, backward
+	return None, forward, backward
+
+
+def solve(cube):
+#============================================================================
+# Returns an optimal list of rules that makes every face of cube a single
+# color, and a dict of search statistics.
+#============================================================================
+	r = coord.orientation(cube.tiles)
+	start = coord.rotate(cube.tiles, r).encode("ascii")
+	path, forward, backward = search(start, goalState.state)
+	stats = {
+		"forward depth": forward.depth,
+		"backward depth": backward.depth,
+		"forward reached": len(forward.reached),
+		"backward reached": len(backward.reached),
+		"expanded": forward.expanded + backward.expanded,
+		"generated": forward.generated + backward.generated,
+	}
+	if path is None:
+		return None, stats
+	rules = coord.ROTATION_RULES[r]
+	return [ rules[rule] for rule in path ], stats
@@ -0,0 +1,128 @@
+#--------------------------------------------------------------------------------
+# Persistent solution cache for the 2x2x2 Rubik's Cube
+#
+# Maps cube positions to optimal solutions, so that a position solved once
+# costs a single lookup afterwards.  Positions are keyed on their canonical
+# tile string: the cube rotated as a whole to bring its DBL corner home (see
+# Rubik_2x2x2_coord), so that all 24 rotations of a position share one entry.
+# The solution is stored for that rotated cube and translated on the way in
+# and out.
+#
+# Entries live in an SQLite file, in front of which sits an in-memory LRU of
+# the most recently used ones.  When the file holds more than maxEntries
+# solutions, the least recently used tenth of them is deleted.  Every hit,
+# in memory or on disk, counts as a use; the uses are written to the file
+# in batches, before any eviction and on close().
+#--------------------------------------------------------------------------------
+
+import os
+import sqlite3
+from collections import OrderedDict
+
+import Rubik_2x2x2_coord as coord
+
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Rubik_2x2x2_cache.sqlite")
+
+
+class SolutionCache:
+
+	def __init__(self, path=CACHE_FILE, maxEntries=1000000, memoryEntries=10000):
+		self.db = sqlite3.connect(path, timeout=30)
+		#========================================================================
+		# WAL lets batch workers read while one writes; losing the last few
+		# entries in a crash only costs re-solving them.
+		#========================================================================
+		self.db.execute("PRAGMA journal_mode=WAL")
+		self.db.execute("PRAGMA synchronous=NORMAL")
+		self.db.execute("CREATE TABLE IF NOT EXISTS solutions "
+		                "(tiles TEXT PRIMARY KEY, moves TEXT, used INTEGER)")
+		self.maxEntries = maxEntries
+		self.memoryEntries = memoryEntries
+		self.memory = OrderedDict()
+		self.touched = { }
+		self.clock, self.count = self.db.execute(
+			"SELECT COALESCE(MAX(used), 0), COUNT(*) FROM solutions").fetchone()
+		self.hits = 0
+		self.misses = 0
+
+	def key(self, cube):
+		#========================================================================
+		# Canonical tile string of cube, and the rotation that produced it
+		#========================================================================
+		r = coord.orientation(cube.tiles)
+		return coord.rotate(cube.tiles, r), r
+
+	def remember(self, tiles, moves):
+		self.memory[tiles] = moves
+		self.memory.move_to_end(tiles)
+		if len(self.memory) > self.memoryEntries:
+			self.memory.popitem(last=False)
+
+	def get(self, cube):
+		#========================================================================
+		# Returns the cached solution of cube as a list of rules, or None
+		#========================================================================
+		tiles, r = self.key(cube)
+		moves = self.memory.get(tiles)
+		if moves is not None:
+			self.memory.move_to_end(tiles)
+		else:
+			row = self.db.execute("SELECT moves FROM solutions WHERE tiles = ?", (tiles,)).fetchone()
+			if row is None:
+				self.misses += 1
+				return None
+			moves = row[0].split()
+			self.remember(tiles, moves)
+		self.touch(tiles)
+		self.hits += 1
+		rules = coord.ROTATION_RULES[r]
+		return [ rules[rule] for rule in moves ]
+
+	def touch(self, tiles):
+		#========================================================================
+		# Records a use of tiles, to be written by flush()
+		#========================================================================
+		self.clock += 1
+		self.touched[tiles] = self.clock
+		if len(self.touched) >= self.memoryEntries:
+			with self.db:
+				self.flush()
+
+	def flush(self):
+		#========================================================================
+		# Writes the recorded uses to the file, in the caller's transaction
+		#========================================================================
+		if self.touched:
+			self.db.executemany("UPDATE solutions SET used = ? WHERE tiles = ?",
+			                    [ (used, tiles) for tiles, used in self.touched.items() ])
+			self.touched.clear()
+
+	def put(self, cube, moves):
+		#========================================================================
+		# Stores moves, an optimal solution of cube as given
+		#========================================================================
+		tiles, r = self.key(cube)
+		unrotate = { rule: name for name, rule in coord.ROTATION_RULES[r].items() }
+		moves = [ unrotate[rule] for rule in moves ]
+		self.remember(tiles, moves)
+		self.clock += 1
+		with self.db:
+			self.flush()
+			added = self.db.execute("INSERT OR IGNORE INTO solutions VALUES (?, ?, ?)",
+			                        (tiles, " ".join(moves), self.clock)).rowcount
+			self.count += added
+			if self.count > self.maxEntries:
+				#================================================================
+				# Other processes may share the file: recount before evicting
+				#================================================================
+				self.count = self.db.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+				if self.count > self.maxEntries:
+					evict = self.count - self.maxEntries * 9 // 10
+					self.db.execute("DELETE FROM solutions WHERE tiles IN "
+					                "(SELECT tiles FROM solutions ORDER BY used LIMIT ?)", (evict,))
+					self.count -= evict
+
+	def close(self):
+		with self.db:
+			self.flush()
+		self.db.close()
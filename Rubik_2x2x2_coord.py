@@ -0,0 +1,290 @@
+#--------------------------------------------------------------------------------
+# Corner coordinates for the 2x2x2 Rubik's Cube
+#
+# A 2x2x2 cube consists of 8 corner pieces.  Once the whole-cube orientation is
+# factored out by keeping the down-back-left (DBL) corner fixed, a position is
+# completely described by
+#   cp : the permutation of the remaining 7 corners     (7!    = 5040 values)
+#   co : the twist of those 7 corners, of which only 6
+#        are free since the twists sum to 0 mod 3       (3^6   =  729 values)
+# giving 5040 * 729 = 3,674,160 positions, each identified by the dense index
+#   cp * NUM_CO + co
+#
+# A tile string is first rotated as a whole so that the DBL piece is at home;
+# cubes that differ only by a whole-cube rotation get the same index.  With DBL
+# fixed, only the U, R and F face turns are needed: on a 2x2x2 the D, L and B
+# turns are the same as U, R and F up to a rotation of the whole cube.
+# A position is solved when every face shows a single color, which may leave
+# the cube rotated with respect to goalState.
+#
+# index() and tiles() convert one position at a time, in pure Python: about
+# 0.1M and 0.3M positions per second.  Only whole batches reach a million
+# or more: see Rubik_2x2x2_numpy.CubeBatch.indices() and fromIndices().
+#--------------------------------------------------------------------------------
+
+from itertools import permutations, product
+
+from Rubik_2x2x2 import RULES, goalState
+
+#============================================================================
+# Sticker indices of each corner slot, listed with the U or D sticker first
+# and the other two following clockwise.  The orientation of the piece in a
+# slot is the position (0,1,2) of its U/D-colored sticker in that list.
+#============================================================================
+CORNERS = (
+	( 3,  4,  9),   # URF
+	( 2,  8, 17),   # UFL
+	( 0, 16, 21),   # ULB
+	( 1, 20,  5),   # UBR
+	(13, 11,  6),   # DFR
+	(12, 19, 10),   # DLF
+	(15,  7, 22),   # DRB
+	(14, 23, 18),   # DBL (fixed)
+)
+FIXED_CORNER = 7
+
+NUM_CP = 5040
+NUM_CO = 729
+NUM_STATES = NUM_CP * NUM_CO
+
+GENERATORS = ["U", "U'", "R", "R'", "F", "F'"]
+
+#============================================================================
+# Colors of the pieces in the solved cube
+#============================================================================
+HOME_COLORS = [ "".join(goalState.tiles[i] for i in c) for c in CORNERS ]
+PIECE = { frozenset(colors): piece for piece, colors in enumerate(HOME_COLORS) }
+UD_COLORS = goalState.tiles[0] + goalState.tiles[12]
+
+FACTORIAL = [1, 1, 2, 6, 24, 120, 720, 5040]
+
+
+def compose(first, second):
+#============================================================================
+# Tile permutation (in RULES form) equivalent to applying first, then second
+#============================================================================
+	return [ first[i] for i in second ]
+
+
+def inverse(perm):
+	result = [0] * len(perm)
+	for i, p in enumerate(perm):
+		result[p] = i
+	return result
+
+
+def rotations():
+#============================================================================
+# The 24 whole-cube rotations as tile permutations, identity first.
+# Turning U and D' together turns the whole cube about the U-D axis, and
+# likewise R with L'; these two quarter rotations generate all 24.
+#============================================================================
+	identity = list(range(24))
+	axes = [ compose(RULES["U"], RULES["D'"]), compose(RULES["R"], RULES["L'"]) ]
+	found = [ identity ]
+	for perm in found:
+		for axis in axes:
+			rotated = compose(perm, axis)
+			if rotated not in found:
+				found.append(rotated)
+	return found
+
+ROTATIONS = rotations()
+
+
+def slotOf(sticker):
+	for s, c in enumerate(CORNERS):
+		if sticker in c:
+			return s, c.index(sticker)
+
+
+#============================================================================
+# ORIENT[s][k] is the rotation that brings the DBL piece home, when that
+# piece is in slot s with its U/D-colored sticker at position k.
+#============================================================================
+ORIENT = [ [None]*3 for c in CORNERS ]
+for r, perm in enumerate(ROTATIONS):
+	#========================================================================
+	# rotation r moves the tile at perm[i] to i
+	#========================================================================
+	s, k = slotOf(perm[CORNERS[FIXED_CORNER][0]])
+	ORIENT[s][k] = r
+
+#============================================================================
+# ROTATION_RULES[r][rule] is the rule that acts on a cube the way rule acts
+# on the same cube after rotation r, so that moves found for a rotated cube
+# can be replayed on the cube as given.
+#============================================================================
+ROTATION_RULES = []
+for perm in ROTATIONS:
+	inv = inverse(perm)
+	names = {}
+	for rule in RULES:
+		conjugate = [ perm[RULES[rule][inv[j]]] for j in range(24) ]
+		names[rule] = next(r for r in RULES if RULES[r] == conjugate)
+	ROTATION_RULES.append(names)
+
+
+def corners(rule):
+#============================================================================
+# Returns the effect of rule on corner slots as two lists:
+#   dest[s]  : the slot that the piece in slot s moves to
+#   twist[s] : the amount added (mod 3) to its orientation on the way
+#============================================================================
+	newPosition = inverse(RULES[rule])
+	dest = []
+	twist = []
+	for c in CORNERS:
+		s, k = slotOf(newPosition[c[0]])
+		dest.append(s)
+		twist.append(k)
+	return dest, twist
+
+
+#============================================================================
+# Lookup tables for the coordinates.  Every corner permutation and twist is
+# listed by its rank, and the rank of each is kept in a dict, so ranking and
+# unranking a position each cost one lookup per coordinate instead of a
+# Lehmer code computation.
+#============================================================================
+PERMUTATIONS = list(permutations(range(7)))  # lexicographic, i.e. by rank
+PERMUTATION_RANK = { perm: cp for cp, perm in enumerate(PERMUTATIONS) }
+TWISTS = [ twist + (-sum(twist) % 3,) for twist in product(range(3), repeat=6) ]
+TWIST_RANK = { twist: co for co, twist in enumerate(TWISTS) }
+
+#============================================================================
+# READING maps the three colors seen in a corner slot (in CORNERS order) to
+# the piece there and its twist.  A real piece always shows its colors in
+# the same cyclic order; the other three orders, and color triples that are
+# no piece at all, are missing from READING.
+#============================================================================
+READING = { }
+for piece, colors in enumerate(HOME_COLORS):
+	for t in range(3):
+		READING[ "".join( colors[(j - t) % 3] for j in range(3) ) ] = (piece, t)
+
+#============================================================================
+# SLOT_TILES[r][s] are the tiles of a cube that rotation r brings to corner
+# slot s, so a slot of the rotated cube can be read without rotating the
+# whole tile string first.
+#============================================================================
+SLOT_TILES = [ [ tuple( perm[i] for i in c ) for c in CORNERS ] for perm in ROTATIONS ]
+
+
+def orientation(tiles):
+#============================================================================
+# Returns the number of the rotation that brings the DBL piece of the cube
+# given by tiles home.  Raises ValueError if there is no DBL piece (or only
+# a mirrored one).
+#============================================================================
+	if len(tiles) != len(goalState.tiles):
+		raise ValueError("expected %d tiles, got %d" % (len(goalState.tiles), len(tiles)))
+	for s, c in enumerate(CORNERS):
+		reading = READING.get(tiles[c[0]] + tiles[c[1]] + tiles[c[2]])
+		if reading is not None and reading[0] == FIXED_CORNER:
+			return ORIENT[s][reading[1]]
+	raise ValueError("no " + HOME_COLORS[FIXED_CORNER] + " corner")
+
+
+def rotate(tiles, r):
+	return "".join( tiles[i] for i in ROTATIONS[r] )
+
+
+def cubies(tiles):
+#============================================================================
+# Reads the piece and twist in each of the 7 free corner slots from a tile
+# string, as seen with the whole cube rotated to bring the DBL piece home.
+# Raises ValueError if tiles does not describe a reachable position: every
+# corner slot must hold a real piece, each piece must appear once, and the
+# twists must sum to 0 mod 3.  (Every permutation of the corners can be
+# reached on a 2x2x2, so there is no parity condition.)
+#============================================================================
+	slots = SLOT_TILES[orientation(tiles)]
+	perm = []
+	twist = []
+	for c in slots:
+		colors = tiles[c[0]] + tiles[c[1]] + tiles[c[2]]
+		reading = READING.get(colors)
+		if reading is None:
+			raise ValueError("invalid corner " + colors)
+		perm.append(reading[0])
+		twist.append(reading[1])
+	del perm[FIXED_CORNER], twist[FIXED_CORNER]
+	if sorted(perm) != list(range(FIXED_CORNER)):
+		raise ValueError("corner pieces repeat")
+	if sum(twist) % 3:
+		raise ValueError("corner twists do not sum to 0 mod 3")
+	return tuple(perm), tuple(twist)
+
+
+def validate(tiles):
+#============================================================================
+# Raises ValueError, saying why, if tiles is not a position that can be
+# reached from goalState by turning faces
+#============================================================================
+	cubies(tiles)
+
+
+def index(tiles):
+#============================================================================
+# Dense index in [0, NUM_STATES) of the position given by a tile string
+#============================================================================
+	perm, twist = cubies(tiles)
+	return PERMUTATION_RANK[perm]*NUM_CO + TWIST_RANK[twist]
+
+
+def tiles(idx):
+#============================================================================
+# Tile string of the position with the given index, with its DBL corner home
+#============================================================================
+	cp, co = divmod(idx, NUM_CO)
+	perm = PERMUTATIONS[cp]
+	twist = TWISTS[co]
+	result = list(goalState.tiles)
+	for s in range(FIXED_CORNER):
+		colors = HOME_COLORS[perm[s]]
+		c = CORNERS[s]
+		t = twist[s]
+		result[c[t]], result[c[(t+1) % 3]], result[c[(t+2) % 3]] = colors
+	return "".join(result)
+
+
+#============================================================================
+# Move tables: CP_MOVE[m][cp] and CO_MOVE[m][co] give the coordinates after
+# applying GENERATORS[m], so a move on an index costs two list lookups.
+# The permutation and twist coordinates change independently of each other.
+# The tables are only built when first used (by moveTables, or by reading
+# CP_MOVE or CO_MOVE), so that importing this module just to rank, rotate or
+# validate cubes stays cheap.
+#============================================================================
+
+def buildMoveTables():
+	cpMove = []
+	coMove = []
+	for rule in GENERATORS:
+		dest, twist = corners(rule)
+		source = inverse(dest)
+		cpMove.append([ PERMUTATION_RANK[tuple( perm[source[s]] for s in range(7) )]
+		                for perm in PERMUTATIONS ])
+		coMove.append([ TWIST_RANK[tuple( (old[source[s]] + twist[source[s]]) % 3 for s in range(7) )]
+		                for old in TWISTS ])
+	return cpMove, coMove
+
+
+def moveTables():
+	global CP_MOVE, CO_MOVE
+	if "CP_MOVE" not in globals():
+		CP_MOVE, CO_MOVE = buildMoveTables()
+	return CP_MOVE, CO_MOVE
+
+
+def __getattr__(name):
+	if name in ("CP_MOVE", "CO_MOVE"):
+		return moveTables()[name == "CO_MOVE"]
+	raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def applyMove(idx, m):
+	cpMove, coMove = moveTables()
+	cp, co = divmod(idx, NUM_CO)
+	return cpMove[m][cp]*NUM_CO + coMove[m][co]
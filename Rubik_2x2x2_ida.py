@@ -0,0 +1,106 @@
+#--------------------------------------------------------------------------------
+# Iterative-deepening A* for the 2x2x2 Rubik's Cube
+#
+# Works on the corner coordinates of Rubik_2x2x2_coord.  The heuristic is the
+# larger of two exact distances, each ignoring part of the cube:
+#   CP_DIST[cp] : quarter turns needed to place the corners, ignoring twist
+#   CO_DIST[co] : quarter turns needed to twist the corners, ignoring places
+# Neither can overestimate, so the first solution found is optimal.  Both
+# tables are small (5040 and 729 entries) and built by BFS in milliseconds.
+#--------------------------------------------------------------------------------
+
+import Rubik_2x2x2_coord as coord
+
+FOUND = -1
+
+
+def buildDistance(moveTable, size):
+#============================================================================
+# Breadth-first distances from coordinate 0 under the given move tables
+#============================================================================
+	dist = [None] * size
+	dist[0] = 0
+	frontier = [0]
+	depth = 0
+	while frontier:
+		depth += 1
+		layer = []
+		for x in frontier:
+			for table in moveTable:
+				n = table[x]
+				if dist[n] is None:
+					dist[n] = depth
+					layer.append(n)
+		frontier = layer
+	return dist
+
+CP_DIST = buildDistance(coord.CP_MOVE, coord.NUM_CP)
+CO_DIST = buildDistance(coord.CO_MOVE, coord.NUM_CO)
+
+
+class IDAStar:
+#============================================================================
+# One solve.  The current path is kept on a single list of GENERATORS
+# indices that grows and shrinks with the recursion; iterations records
+# (threshold, nodes expanded) for each pass.
+#============================================================================
+
+	def __init__(self):
+		self.path = []
+		self.nodes = 0
+		self.iterations = []
+
+	def bound(self, cp, co, g, threshold, last):
+		#========================================================================
+		# Depth-first search below (cp, co), reached with g moves.  Returns
+		# FOUND, or the smallest f-value that exceeded threshold.
+		#========================================================================
+		self.nodes += 1
+		h = max(CP_DIST[cp], CO_DIST[co])
+		if g + h > threshold:
+			return g + h
+		if h == 0:
+			return FOUND
+		minimum = float("inf")
+		for m in range(len(coord.GENERATORS)):
+			#====================================================================
+			# GENERATORS come in (turn, inverse) pairs: never undo the last
+			# move, write a half turn as X' X', or turn the same face thrice
+			#====================================================================
+			if m ^ 1 == last:
+				continue
+			if m == last and (m & 1 or self.path[-2:] == [m, m]):
+				continue
+			self.path.append(m)
+			t = self.bound(coord.CP_MOVE[m][cp], coord.CO_MOVE[m][co], g+1, threshold, m)
+			if t == FOUND:
+				return FOUND
+			minimum = min(minimum, t)
+			self.path.pop()
+		return minimum
+
+	def run(self, idx):
+		#========================================================================
+		# Returns the GENERATORS indices of an optimal solution from idx
+		#========================================================================
+		cp, co = divmod(idx, coord.NUM_CO)
+		threshold = max(CP_DIST[cp], CO_DIST[co])
+		while True:
+			self.nodes = 0
+			t = self.bound(cp, co, 0, threshold, None)
+			self.iterations.append((threshold, self.nodes))
+			if t == FOUND:
+				return self.path
+			threshold = t
+
+
+def solve(cube):
+#============================================================================
+# Returns an optimal list of rules that makes every face of cube a single
+# color, and the (threshold, nodes) of each iteration.
+#============================================================================
+	r = coord.orientation(cube.tiles)
+	rules = coord.ROTATION_RULES[r]
+	ida = IDAStar()
+	path = ida.run(coord.index(cube.tiles))
+	return [ rules[coord.GENERATORS[m]] for m in path ], ida.iterations
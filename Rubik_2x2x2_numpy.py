@@ -0,0 +1,306 @@
+#--------------------------------------------------------------------------------
+# Vectorized move application for the 2x2x2 Rubik's Cube (requires NumPy)
+#
+# A CubeBatch holds N cube states as an (N, 24) uint8 array of tile colors, in
+# the same sticker order as Cube.state.  Each rule is applied to the whole
+# batch at once by fancy indexing with its RULES permutation, and goal tests,
+# heuristics and duplicate removal are likewise done per batch.
+#
+# indices() and fromIndices() convert whole batches to and from the position
+# indices of Rubik_2x2x2_coord without a Python loop over the positions
+# (measured at about 3.2M positions per second unranked and 1.3M ranked).
+#
+# layers() uses this for layer-synchronous breadth-first search.  To print the
+# number of positions at each distance from a configuration (default: the
+# solved cube):
+#    python3 Rubik_2x2x2_numpy.py [-c config] [-d maxDepth]
+#--------------------------------------------------------------------------------
+
+import sys, getopt
+import time
+
+import numpy as np
+
+from Rubik_2x2x2 import RULES, Cube, goalState, expansion
+import Rubik_2x2x2_coord as coord
+
+PERMUTATION = { rule: np.array(perm, dtype=np.intp) for rule, perm in RULES.items() }
+GOAL = np.frombuffer(goalState.state, dtype=np.uint8)
+
+#============================================================================
+# Rows are packed into one int64 each by reading the 24 tiles as the digits
+# of a base-6 number (6^24 < 2^63), with colors numbered by COLOR_CODE.
+# Bytes that are no color of the cube get the code UNKNOWN_CODE.
+#============================================================================
+UNKNOWN_CODE = 6
+COLOR_CODE = np.full(256, UNKNOWN_CODE, dtype=np.uint8)
+for code, color in enumerate(dict.fromkeys(goalState.tiles)):
+	COLOR_CODE[ord(color)] = code
+NUM_CODES = UNKNOWN_CODE + 1
+
+
+#============================================================================
+# Tables of Rubik_2x2x2_coord as arrays.  A corner is read as the number
+# (c0*7 + c1)*7 + c2 of the codes of its three tiles (in CORNERS order), and
+# READING_CUBIE gives the piece and twist seen there as piece*3 + twist, or
+# NO_CUBIE for no real piece (which includes any tile of an unknown color).
+# Rotation r brings physical corner SLOT_CORNER[r][s] to free slot s, with
+# its tiles shifted by SLOT_SHIFT[r][s] places; the twist read in the slot
+# is the one read at the corner less the shift: SHIFTED_CUBIE[cubie*3 +
+# shift].
+# SLOT_COLORS[piece*3 + twist] are the colors of a slot (in CORNERS order)
+# holding that piece with that twist.
+#============================================================================
+CORNERS = np.array(coord.CORNERS, dtype=np.intp)
+ORIENT = np.array(coord.ORIENT, dtype=np.intp)
+PERMUTATIONS = np.array(coord.PERMUTATIONS, dtype=np.int8)
+TWISTS = np.array(coord.TWISTS, dtype=np.int8)
+NO_CUBIE = 3 * len(coord.CORNERS)
+READING_CUBIE = np.full(NUM_CODES**3, NO_CUBIE, dtype=np.int8)
+for colors, (piece, twist) in coord.READING.items():
+	code = 0
+	for color in colors:
+		code = code*NUM_CODES + int(COLOR_CODE[ord(color)])
+	READING_CUBIE[code] = piece*3 + twist
+SHIFTED_CUBIE = np.array([ NO_CUBIE if cubie == NO_CUBIE else cubie - cubie % 3 + (cubie - shift) % 3
+                           for cubie in range(NO_CUBIE + 1) for shift in range(3) ], dtype=np.int8)
+
+def slotCorners():
+	shifted = { tuple( c[(j + k) % 3] for j in range(3) ): (corner, k)
+	            for corner, c in enumerate(coord.CORNERS) for k in range(3) }
+	slots = [ [ shifted[tiles] for tiles in slotTiles[:coord.FIXED_CORNER] ] for slotTiles in coord.SLOT_TILES ]
+	return np.array(slots, dtype=np.intp)[..., 0], np.array(slots, dtype=np.intp)[..., 1]
+
+SLOT_CORNER, SLOT_SHIFT = slotCorners()
+SLOT_COLORS = np.array([ [ ord(colors[(j - t) % 3]) for j in range(3) ]
+                         for colors in coord.HOME_COLORS for t in range(3) ], dtype=np.uint8)
+
+#============================================================================
+# The corner permutation is ranked by its Lehmer code: digit i is the number
+# of later pieces smaller than piece i, with weight (6-i)!, which gives the
+# lexicographic rank of PERMUTATIONS.  All 49 comparisons of piece i with
+# piece j are made at once, and weighted by LEHMER_WEIGHTS[i*7 + j] ((6-i)!
+# for j > i, else 0) in one matrix product; float32 is exact below 2^24 and
+# much the fastest.  RANK_ROWS bounds the size of the comparison matrix.
+# The twist is ranked as the base-3 number of its first 6 twists.
+#============================================================================
+LEHMER_WEIGHTS = np.array([ coord.FACTORIAL[6-i] if j > i else 0
+                            for i in range(7) for j in range(7) ], dtype=np.float32)
+TWIST_WEIGHTS = np.array([ 3**(5-i) for i in range(6) ], dtype=np.int64)
+ALL_PIECES = (1 << coord.FIXED_CORNER) - 1
+RANK_ROWS = 1 << 16
+
+
+def permutationRanks(perm):
+#============================================================================
+# Lexicographic ranks of the rows of perm (permutations of 0..6)
+#============================================================================
+	ranks = np.empty(len(perm), dtype=np.int64)
+	for start in range(0, len(perm), RANK_ROWS):
+		p = perm[start:start+RANK_ROWS]
+		less = (p[:, :, None] > p[:, None, :]).reshape(len(p), -1)
+		ranks[start:start+RANK_ROWS] = less.astype(np.float32) @ LEHMER_WEIGHTS
+	return ranks
+
+
+def member(sortedKeys, keys):
+#============================================================================
+# True where keys occur in sortedKeys (which must be sorted)
+#============================================================================
+	if len(sortedKeys) == 0:
+		return np.zeros(len(keys), dtype=bool)
+	pos = np.searchsorted(sortedKeys, keys)
+	pos[pos == len(sortedKeys)] = 0
+	return sortedKeys[pos] == keys
+
+
+class CubeBatch:
+
+	__slots__ = ("tiles",)
+
+	def __init__(self, tiles):
+		self.tiles = np.ascontiguousarray(tiles, dtype=np.uint8).reshape(-1, 24)
+
+	@classmethod
+	def fromCubes(cls, cubes):
+		return cls(np.frombuffer(b"".join(cube.state for cube in cubes), dtype=np.uint8))
+
+	@classmethod
+	def fromIndices(cls, indices):
+		#========================================================================
+		# The positions with the given coord indices, DBL corner home
+		#========================================================================
+		cp, co = np.divmod(np.asarray(indices, dtype=np.int64), coord.NUM_CO)
+		slots = PERMUTATIONS[cp].astype(np.intp) * 3 + TWISTS[co][:, :coord.FIXED_CORNER]
+		tiles = np.empty((len(cp), 24), dtype=np.uint8)
+		tiles[:, CORNERS[:coord.FIXED_CORNER].ravel()] = SLOT_COLORS[slots].reshape(len(cp), -1)
+		tiles[:, CORNERS[coord.FIXED_CORNER]] = SLOT_COLORS[coord.FIXED_CORNER * 3]
+		return cls(tiles)
+
+	def __len__(self):
+		return len(self.tiles)
+
+	def cubes(self):
+		return [ Cube.fromState(row.tobytes()) for row in self.tiles ]
+
+	def applyRule(self, rule):
+		return CubeBatch(self.tiles[:, PERMUTATION[rule]])
+
+	def expand(self, rules):
+		#========================================================================
+		# All children of the batch: the states after rules[0], then those
+		# after rules[1], and so on.
+		#========================================================================
+		return CubeBatch(np.concatenate([ self.tiles[:, PERMUTATION[rule]] for rule in rules ]))
+
+	def goal(self):
+		return (self.tiles == GOAL).all(axis=1)
+
+	def solved(self):
+		#========================================================================
+		# True where every face shows a single color, in any orientation
+		#========================================================================
+		faces = self.tiles.reshape(-1, 6, 4)
+		return (faces == faces[:, :, :1]).all(axis=(1, 2))
+
+	def heuristic(self):
+		#========================================================================
+		# Number of tiles out of place, per state
+		#========================================================================
+		return (self.tiles != GOAL).sum(axis=1)
+
+	def keys(self):
+		codes = COLOR_CODE[self.tiles]
+		keys = np.zeros(len(codes), dtype=np.int64)
+		for i in range(24):
+			keys *= 6
+			keys += codes[:, i]
+		return keys
+
+	def cubies(self):
+		#========================================================================
+		# Piece and twist in each of the 7 free corner slots, per state, as
+		# coord.cubies() reads them (-1 for no real piece), and a mask of the
+		# states whose every corner holds a real piece, one of them DBL.
+		# Each corner is read once; the slots of the rotated cube are then
+		# picked out of those readings.
+		#========================================================================
+		n = len(self.tiles)
+		c = COLOR_CODE[self.tiles][:, CORNERS].astype(np.int16)
+		cubie = READING_CUBIE[(c[..., 0]*NUM_CODES + c[..., 1])*NUM_CODES + c[..., 2]]
+		fixed = cubie // 3 == coord.FIXED_CORNER
+		slot = fixed.argmax(axis=1)
+		r = ORIENT[slot, cubie[np.arange(n), slot] % 3]
+		rows = np.arange(0, n * len(coord.CORNERS), len(coord.CORNERS))[:, None]
+		cubies = SHIFTED_CUBIE[cubie.ravel()[rows + SLOT_CORNER[r]] * 3 + SLOT_SHIFT[r]]
+		perm, twist = np.divmod(cubies, 3)
+		perm[cubies == NO_CUBIE] = -1
+		valid = (fixed.sum(axis=1) == 1) & (cubie != NO_CUBIE).all(axis=1)
+		return perm, twist, valid
+
+	def indices(self):
+		#========================================================================
+		# coord indices of the states.  Raises ValueError if any state is not
+		# a reachable position: a slot without a real piece, a repeated piece,
+		# or twists that do not sum to 0 mod 3.
+		#========================================================================
+		perm, twist, valid = self.cubies()
+		pieces = np.bitwise_or.reduce(np.left_shift(1, np.maximum(perm, 0).astype(np.int16)), axis=1)
+		valid &= (pieces == ALL_PIECES) & (twist.sum(axis=1) % 3 == 0)
+		if not valid.all():
+			raise ValueError("%d of %d states are not reachable positions"
+			                 % (len(valid) - valid.sum(), len(valid)))
+		cp = permutationRanks(perm)
+		co = twist[:, :6].astype(np.int64) @ TWIST_WEIGHTS
+		return cp * coord.NUM_CO + co
+
+	def unique(self):
+		#========================================================================
+		# The distinct states of the batch, and their sorted keys
+		#========================================================================
+		keys, first = np.unique(self.keys(), return_index=True)
+		return CubeBatch(self.tiles[first]), keys
+
+
+#============================================================================
+# Move tables of Rubik_2x2x2_coord as arrays, one row per GENERATORS move
+#============================================================================
+CP_MOVE = np.array(coord.CP_MOVE, dtype=np.int64)
+CO_MOVE = np.array(coord.CO_MOVE, dtype=np.int64)
+
+
+def distances(table, indices):
+#============================================================================
+# Distances of the positions with the given indices in a packed pattern
+# database table (see Rubik_2x2x2_pdb.pack), as a uint8 array
+#============================================================================
+	return (table[indices >> 1] >> ((indices & 1) << 2).astype(np.uint8)) & 15
+
+
+def descend(table, indices):
+#============================================================================
+# Optimal solutions of many positions at once, by the greedy descent of
+# PatternDatabase.path on all of them in step: each round, every position
+# not yet solved takes the first move that brings it one step closer.
+# Returns, per position, the list of GENERATORS indices of its solution.
+#============================================================================
+	idx = np.array(indices, dtype=np.int64)
+	d = distances(table, idx)
+	length = d.copy()
+	steps = []
+	while (d > 0).any():
+		cp, co = np.divmod(idx, coord.NUM_CO)
+		choice = np.full(len(idx), -1, dtype=np.int8)
+		for m in range(len(coord.GENERATORS)):
+			n = CP_MOVE[m][cp]*coord.NUM_CO + CO_MOVE[m][co]
+			closer = (choice < 0) & (d > 0) & (distances(table, n) == d - 1)
+			choice[closer] = m
+			idx[closer] = n[closer]
+		steps.append(choice)
+		d = np.where(d > 0, d - 1, 0)
+	steps = np.array(steps).T.tolist() if steps else [ [] for i in idx ]
+	return [ path[:n] for path, n in zip(steps, length.tolist()) ]
+
+
+def layers(cube, rules=None, maxDepth=None):
+#============================================================================
+# Breadth-first search from cube, one whole layer at a time.  Returns the
+# number of states at each depth.  By default the search uses the U, R and
+# F turns on the cube rotated to bring its DBL corner home, which reaches
+# each of the 3,674,160 positions once.
+# Every rule has its inverse among the rules, so the children of a layer
+# can only be in the previous layer, the layer itself, or the next one;
+# only the keys of the last two layers are kept for duplicate detection.
+#============================================================================
+	if rules is None:
+		cube, translation = expansion.orient(cube)
+		rules = expansion.rules
+	frontier, current = CubeBatch.fromCubes([cube]).unique()
+	previous = current[:0]
+	counts = [1]
+	while len(frontier) and (maxDepth is None or len(counts) <= maxDepth):
+		children, keys = frontier.expand(rules).unique()
+		new = ~(member(current, keys) | member(previous, keys))
+		frontier = CubeBatch(children.tiles[new])
+		previous, current = current, keys[new]
+		if len(frontier):
+			counts.append(len(frontier))
+	return counts
+
+
+if __name__ == '__main__':
+	cube = goalState
+	maxDepth = None
+	opts, args = getopt.getopt(sys.argv[1:], "c:d:", ["config=", "depth="])
+	for opt, arg in opts:
+		if opt in ("-c", "--config"):
+			cube = Cube(arg)
+		elif opt in ("-d", "--depth"):
+			maxDepth = int(arg)
+
+	start_time = time.time()
+	counts = layers(cube, maxDepth=maxDepth)
+	for depth, count in enumerate(counts):
+		print(depth, count)
+	print("total", sum(counts))
+	print("--- %s seconds ---" % (time.time() - start_time))
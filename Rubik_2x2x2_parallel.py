@@ -0,0 +1,202 @@
+#--------------------------------------------------------------------------------
+# Parallel breadth-first search over all positions of the 2x2x2 Rubik's Cube
+#
+# Works on the position indices of Rubik_2x2x2_coord, one layer at a time, on
+# several worker processes.  The index range is split into one contiguous
+# shard per worker, and each worker owns the positions of its shard: it keeps
+# the part of the frontier that lies there, and is the only one to mark them
+# visited.  A layer takes two phases, separated by barriers:
+#   expand : every worker applies the U, R and F turns (as move tables) to its
+#            frontier, and sets the bit of each child not yet visited in its
+#            own "next" bitmap
+#   merge  : every worker ORs the next bitmaps of all workers over its shard,
+#            keeps the bits not yet visited, marks them visited and reads
+#            them off as its new frontier
+# The visited bitmap and the next bitmaps (one bit per position, about 450 KB
+# each) live in shared memory; no worker ever writes a byte another worker
+# writes in the same phase, so no locks are needed.
+# A worker that fails aborts the barrier, so that the others stop instead of
+# waiting for it; the parent also aborts it if a worker dies outright, and
+# raises RuntimeError.
+#
+# To print the number of positions at each distance from solved, and the
+# positions at the largest distance:
+#    python3 Rubik_2x2x2_parallel.py [-j workers] [-a]
+#
+# -j, --jobs:
+#	Number of worker processes (default: one per core).
+#
+# -a, --antipodes:
+#	Also print the positions farthest from solved.
+#--------------------------------------------------------------------------------
+
+import sys, getopt
+import os
+import time
+import queue
+import multiprocessing
+from multiprocessing import shared_memory
+
+import Rubik_2x2x2_coord as coord
+
+NUM_BYTES = (coord.NUM_STATES + 7) // 8
+MAX_DEPTH = 32
+POLL_SECONDS = 0.5
+
+#============================================================================
+# Positions (0-7) of the set bits of each byte value
+#============================================================================
+BITS = [ tuple( bit for bit in range(8) if byte >> bit & 1 ) for byte in range(256) ]
+
+
+def shard(w, workers):
+#============================================================================
+# Range of bitmap bytes owned by worker w
+#============================================================================
+	return NUM_BYTES * w // workers, NUM_BYTES * (w + 1) // workers
+
+
+def worker(w, workers, names, barrier, results):
+#============================================================================
+# Runs the search on shard w.  Writes the size of each layer in its shard to
+# counts[w*MAX_DEPTH + depth], and puts (w, depth, layer) on results for
+# the deepest layer found in its shard.
+#============================================================================
+	blocks = [ shared_memory.SharedMemory(name) for name in names ]
+	visited, counts = blocks[0].buf, blocks[1].buf.cast("i")
+	nexts = [ block.buf for block in blocks[2:] ]
+	mine = nexts[w]
+	try:
+		lo, hi = shard(w, workers)
+		NUM_CO = coord.NUM_CO
+		moves = [ ([cp*NUM_CO for cp in cpMove], coMove)
+		          for cpMove, coMove in zip(coord.CP_MOVE, coord.CO_MOVE) ]
+		frontier = [0] if lo == 0 else []
+		last, lastDepth = frontier, 0
+		depth = 0
+		counts[w*MAX_DEPTH] = len(frontier)
+		while True:
+			#================================================================
+			# expand
+			#================================================================
+			for idx in frontier:
+				cp, co = divmod(idx, NUM_CO)
+				for cpMove, coMove in moves:
+					n = cpMove[cp] + coMove[co]
+					byte = n >> 3
+					bit = 1 << (n & 7)
+					if not visited[byte] & bit:
+						mine[byte] |= bit
+			barrier.wait()
+			#================================================================
+			# merge
+			#================================================================
+			found = 0
+			for next in nexts:
+				found |= int.from_bytes(next[lo:hi], "little")
+			seen = int.from_bytes(visited[lo:hi], "little")
+			found &= ~seen
+			visited[lo:hi] = (seen | found).to_bytes(hi - lo, "little")
+			frontier = []
+			base = lo * 8
+			for i, byte in enumerate(found.to_bytes(hi - lo, "little")):
+				if byte:
+					for bit in BITS[byte]:
+						frontier.append(base + i*8 + bit)
+			depth += 1
+			counts[w*MAX_DEPTH + depth] = len(frontier)
+			barrier.wait()
+			#================================================================
+			# Every count of the layer is in, and no one reads the next
+			# bitmaps again until after the next expand phase.
+			#================================================================
+			mine[:] = bytes(NUM_BYTES)
+			if frontier:
+				last, lastDepth = frontier, depth
+			if not any( counts[v*MAX_DEPTH + depth] for v in range(workers) ):
+				break
+		results.put((w, lastDepth, last))
+	except BaseException:
+		barrier.abort()
+		raise
+	finally:
+		del visited, counts, nexts, mine
+		for block in blocks:
+			block.close()
+
+
+def distribution(workers=None):
+#============================================================================
+# Breadth-first search from the solved cube over all positions.  Returns the
+# number of positions at each distance, and the indices of those at the
+# largest distance.
+#============================================================================
+	workers = workers or os.cpu_count() or 1
+	blocks = [ shared_memory.SharedMemory(create=True, size=NUM_BYTES),
+	           shared_memory.SharedMemory(create=True, size=4 * workers * MAX_DEPTH) ]
+	blocks += [ shared_memory.SharedMemory(create=True, size=NUM_BYTES) for w in range(workers) ]
+	try:
+		for block in blocks:
+			block.buf[:] = bytes(block.size)
+		blocks[0].buf[0] = 1  # the solved cube
+		names = [ block.name for block in blocks ]
+		barrier = multiprocessing.Barrier(workers)
+		results = multiprocessing.Queue()
+		processes = [ multiprocessing.Process(target=worker, args=(w, workers, names, barrier, results))
+		              for w in range(workers) ]
+		for process in processes:
+			process.start()
+		try:
+			layers = []
+			while len(layers) < workers:
+				try:
+					layers.append(results.get(timeout=POLL_SECONDS))
+				except queue.Empty:
+					#========================================================
+					# A worker killed outright cannot abort the barrier
+					#========================================================
+					for w, process in enumerate(processes):
+						if process.exitcode not in (None, 0):
+							barrier.abort()
+							raise RuntimeError("worker %d exited with code %d" % (w, process.exitcode))
+		except BaseException:
+			for process in processes:
+				process.join(POLL_SECONDS)
+				if process.exitcode is None:
+					process.terminate()
+					process.join()
+			raise
+		for process in processes:
+			process.join()
+		counts = blocks[1].buf.cast("i")
+		maxDepth = max( depth for w, depth, last in layers )
+		histogram = [ sum( counts[w*MAX_DEPTH + d] for w in range(workers) )
+		              for d in range(maxDepth + 1) ]
+		antipodes = sorted( idx for w, depth, last in layers if depth == maxDepth for idx in last )
+		counts.release()
+	finally:
+		for block in blocks:
+			block.close()
+			block.unlink()
+	return histogram, antipodes
+
+
+if __name__ == '__main__':
+	workers = None
+	showAntipodes = False
+	opts, args = getopt.getopt(sys.argv[1:], "j:a", ["jobs=", "antipodes"])
+	for opt, arg in opts:
+		if opt in ("-j", "--jobs"):
+			workers = int(arg)
+		elif opt in ("-a", "--antipodes"):
+			showAntipodes = True
+
+	start_time = time.time()
+	histogram, antipodes = distribution(workers)
+	for depth, count in enumerate(histogram):
+		print(depth, count)
+	print("total", sum(histogram))
+	if showAntipodes:
+		for idx in antipodes:
+			print(coord.tiles(idx))
+	print("--- %s seconds ---" % (time.time() - start_time))
@@ -0,0 +1,126 @@
+#--------------------------------------------------------------------------------
+# Scramble generator for the 2x2x2 Rubik's Cube
+#
+# Writes count scrambled configurations, one per line in the terse form that
+# Cube and Rubik_2x2x2_batch accept, to standard output or to a file.  Two
+# kinds of scramble are available:
+#   moves : length random rules applied to the solved cube, never undoing the
+#           previous rule or otherwise cancelling (see randomRules)
+#   state : a position drawn uniformly from all 3,674,160 positions, by
+#           picking a random index of Rubik_2x2x2_coord
+#   depth : a random position exactly depth quarter turns from solved, found
+#           with the pattern database (see depthScramble)
+# The same seed always gives the same scrambles.
+#
+#    python3 Rubik_2x2x2_scramble.py [-n count] [-l length | -u | -d depth] [-s seed] [-o file]
+#
+# -n, --count:
+#	Number of scrambles (default 1).
+#
+# -l, --length:
+#	Number of random rules per scramble (default 25).
+#
+# -u, --uniform:
+#	Draw uniformly random positions instead of applying random rules.
+#
+# -d, --depth:
+#	Draw random positions at the given optimal distance (0 to 14).
+#
+# -s, --seed:
+#	Seed for the random number generator (default: the clock).
+#
+# -o, --output:
+#	File to write the scrambles to (default: standard output).
+#--------------------------------------------------------------------------------
+
+import sys, getopt
+import random
+
+from Rubik_2x2x2 import MOVES, goalState, randomRules
+import Rubik_2x2x2_coord as coord
+
+
+def moveScramble(length, rng=random):
+#============================================================================
+# Tiles of the solved cube after length random rules
+#============================================================================
+	state = goalState.state
+	for rule in randomRules(length, rng):
+		state = MOVES[rule](state)
+	return bytes(state).decode("ascii")
+
+
+def stateScramble(rng=random):
+#============================================================================
+# Tiles of a uniformly random position, with its DBL corner home
+#============================================================================
+	return coord.tiles(rng.randrange(coord.NUM_STATES))
+
+
+def depthScramble(depth, rng=random):
+#============================================================================
+# Tiles of a random position exactly depth quarter turns from solved.  A
+# uniformly random position at least that far away is drawn, then walked
+# down towards solved by random moves that each take one step off its
+# distance; any position at the given depth can come out, though not all
+# equally often.
+#============================================================================
+	import Rubik_2x2x2_pdb
+	pdb = Rubik_2x2x2_pdb.database()
+	if not 0 <= depth <= 14:
+		raise ValueError("no position at depth %d" % depth)
+	idx = rng.randrange(coord.NUM_STATES)
+	while pdb.distance(idx) < depth:
+		idx = rng.randrange(coord.NUM_STATES)
+	for d in range(pdb.distance(idx) - 1, depth - 1, -1):
+		idx = rng.choice([ n for n in (coord.applyMove(idx, m) for m in range(len(coord.GENERATORS)))
+		                   if pdb.distance(n) == d ])
+	return coord.tiles(idx)
+
+
+def scrambles(count, length=None, seed=None, depth=None):
+#============================================================================
+# Generates count scrambles: positions at the given depth, move scrambles
+# of the given length, or uniform random positions if both are None.
+#============================================================================
+	rng = random.Random(seed)
+	for i in range(count):
+		if depth is not None:
+			yield depthScramble(depth, rng)
+		elif length is None:
+			yield stateScramble(rng)
+		else:
+			yield moveScramble(length, rng)
+
+
+def write(lines, f):
+	f.writelines( line + "\n" for line in lines )
+
+
+if __name__ == '__main__':
+	count = 1
+	length = 25
+	seed = None
+	depth = None
+	output = None
+	opts, args = getopt.getopt(sys.argv[1:], "n:l:ud:s:o:",
+	                           ["count=", "length=", "uniform", "depth=", "seed=", "output="])
+	for opt, arg in opts:
+		if opt in ("-n", "--count"):
+			count = int(arg)
+		elif opt in ("-l", "--length"):
+			length = int(arg)
+		elif opt in ("-u", "--uniform"):
+			length = None
+		elif opt in ("-d", "--depth"):
+			depth = int(arg)
+		elif opt in ("-s", "--seed"):
+			seed = int(arg)
+		elif opt in ("-o", "--output"):
+			output = arg
+
+	if output is None:
+		write(scrambles(count, length, seed, depth), sys.stdout)
+	else:
+		with open(output, "w") as f:
+			write(scrambles(count, length, seed, depth), f)
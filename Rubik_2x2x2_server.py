@@ -0,0 +1,296 @@
+#--------------------------------------------------------------------------------
+# Solver service for the 2x2x2 Rubik's Cube
+#
+# A long-running asyncio HTTP server that loads the pattern database once
+# and then answers solve requests from memory:
+#   GET  /solve?config=WOWO+BBBB+RWRW+YRYR+GGGG+YOYO
+#        {"config": ..., "moves": [...], "length": n}   (or {"error": ...})
+#   POST /solve    one configuration per line in the body; one JSON object
+#                  per line in the answer, in the same order
+#   GET  /stats    request, batch and cache counters, and latency percentiles
+# Requests that arrive together are solved together: they are queued, and
+# the queue is drained into one batch, whose positions are looked up in a
+# SolutionCache and otherwise solved by a vectorized descent of the pattern
+# database (see Rubik_2x2x2_numpy.descend; one by one if NumPy is missing).
+#
+#    python3 Rubik_2x2x2_server.py [-p port | -u socket] [-k cachefile] [-w ms] [-b size]
+#
+# -p, --port:
+#	Port to listen on at 127.0.0.1 (default 8222).
+#
+# -u, --unix:
+#	Listen on this Unix socket instead, e.g. for
+#	  curl --unix-socket /tmp/rubik.sock http://localhost/solve?config=...
+#
+# -k, --cache:
+#	SQLite solution cache (see Rubik_2x2x2_cache); by default the cache is
+#	kept in memory only.
+#
+# -w, --window:
+#	Milliseconds to wait for more requests before solving a batch
+#	(default 0: just the requests that have already arrived).
+#
+# -b, --batch:
+#	Largest number of positions solved in one batch (default 1024).
+#--------------------------------------------------------------------------------
+
+import sys, getopt
+import asyncio
+import json
+import time
+from collections import deque
+from urllib.parse import urlsplit, parse_qs
+
+from Rubik_2x2x2 import Cube
+import Rubik_2x2x2_coord as coord
+import Rubik_2x2x2_pdb
+import Rubik_2x2x2_cache
+
+try:
+	import numpy as np
+	import Rubik_2x2x2_numpy
+except ImportError:
+	np = None
+
+#============================================================================
+# Below this many positions a batch is solved one position at a time, which
+# is quicker than setting up the arrays
+#============================================================================
+VECTOR_BATCH = 8
+
+STATUS = { 200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           500: "Internal Server Error" }
+
+
+def errorText(e):
+#============================================================================
+# Text of an exception for an answer: its message for a bad configuration,
+# its type as well for anything else
+#============================================================================
+	if isinstance(e, (ValueError, UnicodeEncodeError)):
+		return str(e)
+	return "%s: %s" % (type(e).__name__, e)
+
+
+class SolverService:
+	#============================================================================
+	# The warm solver state, the request queue and the counters
+	#============================================================================
+
+	def __init__(self, cache, window=0.0, maxBatch=1024):
+		self.pdb = Rubik_2x2x2_pdb.database()
+		self.table = np.frombuffer(self.pdb.table, dtype=np.uint8) if np else None
+		self.cache = cache
+		self.window = window
+		self.maxBatch = maxBatch
+		self.queue = asyncio.Queue()
+		self.latencies = deque(maxlen=10000)
+		self.requests = 0
+		self.batches = 0
+		self.errors = 0
+		self.started = time.time()
+
+	async def solve(self, config):
+		#========================================================================
+		# Queues config for the next batch and returns its result
+		#========================================================================
+		future = asyncio.get_running_loop().create_future()
+		self.queue.put_nowait((config, future, time.perf_counter()))
+		return await future
+
+	async def batcher(self):
+		#========================================================================
+		# Solves queued requests a batch at a time.  A batch that fails fails
+		# its own requests only; the loop goes on to the next.
+		#========================================================================
+		while True:
+			batch = [ await self.queue.get() ]
+			await asyncio.sleep(self.window)
+			while len(batch) < self.maxBatch and not self.queue.empty():
+				batch.append(self.queue.get_nowait())
+			try:
+				self.solveBatch(batch)
+			except Exception as e:
+				self.errors += 1
+				for config, future, start in batch:
+					if not future.done():
+						future.set_exception(e)
+
+	def paths(self, indices):
+		#========================================================================
+		# Solution paths of the indices, as a batch if it is large enough; if
+		# the batch fails, one by one, with the exception in place of the path
+		# of each index that fails
+		#========================================================================
+		if self.table is not None and len(indices) >= VECTOR_BATCH:
+			try:
+				return Rubik_2x2x2_numpy.descend(self.table, indices)
+			except Exception:
+				pass
+		paths = []
+		for idx in indices:
+			try:
+				paths.append(self.pdb.path(idx))
+			except Exception as e:
+				paths.append(e)
+		return paths
+
+	def solveBatch(self, batch):
+		#========================================================================
+		# Solves the configurations of a batch of queued requests and sets
+		# the result of each
+		#========================================================================
+		results = [None] * len(batch)
+		pending = []
+		for i, (config, future, start) in enumerate(batch):
+			try:
+				cube = Cube(config)
+				moves = self.cache.get(cube)
+				if moves is None:
+					pending.append((i, cube, coord.orientation(cube.tiles), coord.index(cube.tiles)))
+				else:
+					results[i] = { "config": config, "moves": moves, "length": len(moves), "cached": True }
+			except Exception as e:
+				results[i] = { "config": config, "error": errorText(e) }
+				self.errors += 1
+		paths = self.paths([ idx for i, cube, r, idx in pending ])
+		for (i, cube, r, idx), path in zip(pending, paths):
+			try:
+				if isinstance(path, Exception):
+					raise path
+				rules = coord.ROTATION_RULES[r]
+				moves = [ rules[coord.GENERATORS[m]] for m in path ]
+				self.cache.put(cube, moves)
+				results[i] = { "config": batch[i][0], "moves": moves, "length": len(moves) }
+			except Exception as e:
+				results[i] = { "config": batch[i][0], "error": errorText(e) }
+				self.errors += 1
+		now = time.perf_counter()
+		for (config, future, start), result in zip(batch, results):
+			self.latencies.append(now - start)
+			if not future.done():
+				future.set_result(result)
+		self.requests += len(batch)
+		self.batches += 1
+
+	def stats(self):
+		latencies = sorted(self.latencies)
+		def percentile(p):
+			if not latencies:
+				return None
+			return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 3)
+		return {
+			"requests": self.requests,
+			"batches": self.batches,
+			"mean batch": round(self.requests / self.batches, 2) if self.batches else None,
+			"errors": self.errors,
+			"cache hits": self.cache.hits,
+			"cache misses": self.cache.misses,
+			"latency ms": { "p50": percentile(0.5), "p90": percentile(0.9),
+			                "p99": percentile(0.99), "max": percentile(1.0) },
+			"uptime s": round(time.time() - self.started, 1),
+		}
+
+	async def route(self, method, target, body):
+		#========================================================================
+		# Returns the status, content type and body of the answer to a request
+		#========================================================================
+		try:
+			return await self.answer(method, target, body)
+		except Exception as e:
+			return 500, "application/json", json.dumps({ "error": errorText(e) }) + "\n"
+
+	async def answer(self, method, target, body):
+		url = urlsplit(target)
+		if url.path == "/solve" and method == "GET":
+			config = parse_qs(url.query).get("config", [""])[0]
+			result = await self.solve(config)
+			return (400 if "error" in result else 200), "application/json", json.dumps(result) + "\n"
+		if url.path == "/solve" and method == "POST":
+			configs = [ line.strip() for line in body.decode("utf-8", "replace").splitlines() if line.strip() ]
+			results = await asyncio.gather(*( self.solve(config) for config in configs ))
+			return 200, "application/x-ndjson", "".join( json.dumps(result) + "\n" for result in results )
+		if url.path == "/stats" and method == "GET":
+			return 200, "application/json", json.dumps(self.stats()) + "\n"
+		if url.path in ("/solve", "/stats"):
+			return 405, "text/plain", "method not allowed\n"
+		return 404, "text/plain", "not found\n"
+
+	async def handle(self, reader, writer):
+		#========================================================================
+		# Serves the HTTP/1.1 requests of one connection, kept alive until the
+		# client closes it or asks to
+		#========================================================================
+		try:
+			while True:
+				line = await reader.readline()
+				if not line:
+					break
+				method, target, version = line.decode("latin-1").split()
+				headers = {}
+				while True:
+					line = await reader.readline()
+					if line in (b"\r\n", b"\n", b""):
+						break
+					name, _, value = line.decode("latin-1").partition(":")
+					headers[name.strip().lower()] = value.strip()
+				body = await reader.readexactly(int(headers.get("content-length", 0)))
+				status, contentType, answer = await self.route(method, target, body)
+				answer = answer.encode("utf-8")
+				keepAlive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+				writer.write(("HTTP/1.1 %d %s\r\nContent-Type: %s\r\nContent-Length: %d\r\n%s\r\n"
+				              % (status, STATUS[status], contentType, len(answer),
+				                 "" if keepAlive else "Connection: close\r\n")).encode("latin-1") + answer)
+				await writer.drain()
+				if not keepAlive:
+					break
+		except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+			pass  # malformed request, or the client went away
+		finally:
+			writer.close()
+
+
+async def serve(service, port=None, unixPath=None):
+	batcher = asyncio.create_task(service.batcher())
+	if unixPath is not None:
+		server = await asyncio.start_unix_server(service.handle, unixPath)
+	else:
+		server = await asyncio.start_server(service.handle, "127.0.0.1", port)
+	for sock in server.sockets:
+		print("listening on", sock.getsockname(), flush=True)
+	async with server:
+		await server.serve_forever()
+	batcher.cancel()
+
+
+if __name__ == '__main__':
+	port = 8222
+	unixPath = None
+	cachePath = ":memory:"
+	window = 0.0
+	maxBatch = 1024
+	opts, args = getopt.getopt(sys.argv[1:], "p:u:k:w:b:",
+	                           ["port=", "unix=", "cache=", "window=", "batch="])
+	for opt, arg in opts:
+		if opt in ("-p", "--port"):
+			port = int(arg)
+		elif opt in ("-u", "--unix"):
+			unixPath = arg
+		elif opt in ("-k", "--cache"):
+			cachePath = arg
+		elif opt in ("-w", "--window"):
+			window = float(arg) / 1000
+		elif opt in ("-b", "--batch"):
+			maxBatch = int(arg)
+
+	async def main():
+		cache = Rubik_2x2x2_cache.SolutionCache(cachePath)
+		try:
+			await serve(SolverService(cache, window, maxBatch), port, unixPath)
+		finally:
+			cache.close()
+
+	try:
+		asyncio.run(main())
+	except KeyboardInterrupt:
+		pass
@@ -0,0 +1,99 @@
+#--------------------------------------------------------------------------------
+# Startup profile of Rubik_2x2x2.py
+#
+# Runs Rubik_2x2x2.py with the given arguments (default: -c 0) several times
+# under python -X importtime, and prints
+#   - the best wall-clock time, that of a bare "python -c pass" for
+#     comparison, and the difference (the startup cost of the program)
+#   - the modules that took longest to import, with the time spent in each
+#     including the modules it imported in turn
+# With -t, exits with status 1 if the startup cost exceeds the budget, so
+# that the check can be run as a test.
+#
+#    python3 Rubik_2x2x2_startup.py [-r runs] [-n top] [-t ms] [-- program arguments]
+#
+# -r, --runs:
+#	Number of runs to take the best of (default 5).
+#
+# -n, --top:
+#	Number of modules to list (default 10).
+#
+# -t, --budget:
+#	Largest acceptable startup cost in milliseconds.
+#--------------------------------------------------------------------------------
+
+import sys, getopt
+import os
+import subprocess
+import time
+
+PROGRAM = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Rubik_2x2x2.py")
+
+
+def run(command):
+#============================================================================
+# Wall-clock seconds of one run of command, and its standard error
+#============================================================================
+	start = time.perf_counter()
+	result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+	return time.perf_counter() - start, result.stderr
+
+
+def importTimes(stderr):
+#============================================================================
+# (cumulative microseconds, module, nesting level) of each line of
+# -X importtime output:
+#   import time: self [us] | cumulative | imported package
+#============================================================================
+	times = []
+	for line in stderr.splitlines():
+		if not line.startswith("import time:") or "cumulative" in line:
+			continue
+		fields = line[len("import time:"):].split("|")
+		name = fields[2].rstrip()
+		level = (len(name) - len(name.lstrip())) // 2
+		times.append((int(fields[1]), name.strip(), level))
+	return times
+
+
+def profile(args, runs=5):
+#============================================================================
+# Best wall-clock time of the program and of a bare interpreter, and the
+# import times of the fastest run of the program
+#============================================================================
+	command = [sys.executable, "-X", "importtime", PROGRAM] + args
+	best = None
+	for i in range(runs):
+		seconds, stderr = run(command)
+		if best is None or seconds < best[0]:
+			best = (seconds, stderr)
+	baseline = min( run([sys.executable, "-c", "pass"])[0] for i in range(runs) )
+	return best[0], baseline, importTimes(best[1])
+
+
+if __name__ == '__main__':
+	runs = 5
+	top = 10
+	budget = None
+	opts, args = getopt.getopt(sys.argv[1:], "r:n:t:", ["runs=", "top=", "budget="])
+	for opt, arg in opts:
+		if opt in ("-r", "--runs"):
+			runs = int(arg)
+		elif opt in ("-n", "--top"):
+			top = int(arg)
+		elif opt in ("-t", "--budget"):
+			budget = float(arg)
+	args = args or ["-c", "0"]
+
+	seconds, baseline, times = profile(args, runs)
+	cost = (seconds - baseline) * 1000
+	print("Rubik_2x2x2.py %s: %.1f ms" % (" ".join(args), seconds * 1000))
+	print("python -c pass: %.1f ms" % (baseline * 1000))
+	print("startup cost: %.1f ms" % cost)
+	print()
+	print("slowest imports (cumulative ms):")
+	for micros, name, level in sorted(times, reverse=True)[:top]:
+		print("%8.1f  %s%s" % (micros / 1000, "  " * level, name))
+	if budget is not None and cost > budget:
+		print("over budget of %.1f ms" % budget)
+		sys.exit(1)
@@ -0,0 +1,157 @@
+#--------------------------------------------------------------------------------
+# Regression tests for the Pentago bitboard engine
+#
+#    python3 -m unittest test_Pentago
+#--------------------------------------------------------------------------------
+
+import unittest
+from unittest import mock
+import random
+
+import Pentago
+
+#============================================================================
+# Directions of a five-in-a-row, as (row step, column step)
+#============================================================================
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+def randomBoard(rng, stones):
+#============================================================================
+# Board string with stones marbles, about half of each color, at random cells
+#============================================================================
+	cells = ["."] * Pentago.NUM_CELLS
+	for k, cell in enumerate(rng.sample(range(Pentago.NUM_CELLS), stones)):
+		cells[cell] = "bw"[k % 2]
+	return "".join(cells)
+
+
+def scanFive(cells, token):
+#============================================================================
+# True if token has five in a row in the board string cells, cell by cell
+#============================================================================
+	size = Pentago.BOARD_SIZE
+	for i in range(size):
+		for j in range(size):
+			for di, dj in DIRECTIONS:
+				line = [ (i + k*di, j + k*dj) for k in range(Pentago.WIN_LENGTH) ]
+				if all( 0 <= m < size and 0 <= n < size and cells[size*m + n] == token
+				        for m, n in line ):
+					return True
+	return False
+
+
+def minimax(player, board, token, depth, ply):
+#============================================================================
+# Value of board for token, who is to move, by plain minimax with the
+# scoring of Player.negamax but no pruning and no transposition table
+#============================================================================
+	result = board.outcome()
+	if result is not None:
+		if result == Pentago.BOTH or result == Pentago.DRAW:
+			return 0
+		return player.INFINITY - ply if result == token else ply - player.INFINITY
+	if depth == 0:
+		value = player.pb576_h(board)
+		return value if token == player.token else -value
+	other = "w" if token == "b" else "b"
+	return max( -minimax(player, board.applyMove(move, token), other, depth-1, ply+1)
+	            for move in board.getMoves() )
+
+
+class BoardTest(unittest.TestCase):
+
+	def setUp(self):
+		self.rng = random.Random(576)
+
+	def testRotateFourTimes(self):
+		for trial in range(20):
+			board = Pentago.PentagoBoard(randomBoard(self.rng, self.rng.randrange(37)))
+			for gameBlock in range(1, Pentago.NUM_BLOCKS + 1):
+				for rotate in ("rotateLeft", "rotateRight"):
+					rotated = board
+					for turn in range(4):
+						rotated = getattr(rotated, rotate)(gameBlock)
+					self.assertEqual(rotated.toString(), board.toString())
+					self.assertEqual(rotated.key, board.key)
+				once = board.rotateLeft(gameBlock)
+				self.assertEqual(once.key, Pentago.zobristKey(once.black, once.white))
+				self.assertEqual(once.rotateRight(gameBlock).toString(), board.toString())
+
+	def testOutcome(self):
+		for trial in range(500):
+			cells = randomBoard(self.rng, self.rng.randrange(10, 37))
+			black, white = scanFive(cells, "b"), scanFive(cells, "w")
+			if black and white:
+				expected = Pentago.BOTH
+			elif black or white:
+				expected = "b" if black else "w"
+			elif "." not in cells:
+				expected = Pentago.DRAW
+			else:
+				expected = None
+			self.assertEqual(Pentago.PentagoBoard(cells).outcome(), expected, cells)
+
+	def testCanonicalKey(self):
+		for trial in range(20):
+			cells = randomBoard(self.rng, self.rng.randrange(1, 37))
+			images = [ Pentago.PentagoBoard("".join( cells[cellMap.index(cell)]
+			                                         for cell in range(Pentago.NUM_CELLS) ))
+			           for cellMap in Pentago.SYMMETRY_CELL ]
+			self.assertEqual(len({ image.canonicalKey()[0] for image in images }), 1)
+			self.assertEqual(len({ image.canonical()[0] for image in images }), 1)
+
+
+class SearchTest(unittest.TestCase):
+	#============================================================================
+	# negamax, with alpha-beta and the transposition table, must give the
+	# value plain minimax gives
+	#============================================================================
+
+	def checkValues(self, stones, depth, trials):
+		rng = random.Random(stones)
+		for trial in range(trials):
+			board = Pentago.PentagoBoard(randomBoard(rng, stones))
+			if board.outcome() is not None:
+				continue
+			player = Pentago.Player("test", "computer", "bw"[trial % 2])
+			expected = minimax(player, board, player.token, depth, 0)
+			#====================================================================
+			# Windows off the value first, which leave bounds in the table,
+			# then searches that must not take those bounds for the value:
+			# outside its window a value is only a bound
+			#====================================================================
+			low = self.search(player, board, depth, -Pentago.INFINITY, expected - 10)
+			self.assertTrue(expected - 10 <= low <= expected, (low, expected))
+			high = self.search(player, board, depth, expected + 10, Pentago.INFINITY)
+			self.assertTrue(expected <= high <= expected + 10, (high, expected))
+			self.assertEqual(self.search(player, board, depth, -Pentago.INFINITY, Pentago.INFINITY),
+			                 expected)
+			self.assertEqual(self.search(player, board, depth, expected-1, expected+1), expected)
+			self.assertEqual(player.miniMax(board, maxDepth=depth)[1], expected)
+
+	def search(self, player, board, depth, alpha, beta):
+		return player.negamax(board, player.token, depth, alpha, beta, 0)[0]
+
+	def testHeuristicValues(self):
+		self.checkValues(14, 2, 6)
+
+	def testCanonicalKeys(self):
+		with mock.patch.object(Pentago, "CANONICAL_STONES", Pentago.NUM_CELLS):
+			self.checkValues(14, 2, 6)
+
+	def testForcedWins(self):
+		self.checkValues(31, 3, 10)
+
+	def testMiniMaxValue(self):
+		rng = random.Random(1)
+		board = Pentago.PentagoBoard(randomBoard(rng, 30))
+		player = Pentago.Player("test", "computer", "b")
+		move, value = player.miniMax(board, maxDepth=2)
+		self.assertEqual(value, minimax(player, board, "b", 2, 0))
+		newBoard = board.applyMove(move, "b")
+		self.assertEqual(-minimax(player, newBoard, "w", 1, 1), value)
+
+
+if __name__ == '__main__':
+	unittest.main()
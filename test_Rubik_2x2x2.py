@@ -0,0 +1,236 @@
+#--------------------------------------------------------------------------------
+# Regression tests for the 2x2x2 Rubik's Cube programs
+#
+#    python3 -m unittest test_Rubik_2x2x2
+#--------------------------------------------------------------------------------
+
+import unittest
+from unittest import mock
+import asyncio
+import json
+
+import Rubik_2x2x2_coord as coord
+
+#============================================================================
+# The DBL piece (7) in a free slot, with a free piece in the DBL slot
+#============================================================================
+DBL_IN_FREE_SLOT = "WWWYBRRRGOGGYYYYOOOOBBBB"
+
+#============================================================================
+# The solved cube with a single corner twisted in place
+#============================================================================
+TWISTED_CORNER = "WWWGWRRRGRGGYYYYOOOOBBBB"
+
+#============================================================================
+# A position one move from solved
+#============================================================================
+SOLVABLE = "WOWOBBBBRWRWYRYRGGGGYOYO"
+
+
+class ValidateTest(unittest.TestCase):
+
+	def testSolved(self):
+		coord.validate("WWWWRRRRGGGGYYYYOOOOBBBB")
+
+	def testDBLPieceInFreeSlot(self):
+		with self.assertRaises(ValueError):
+			coord.validate(DBL_IN_FREE_SLOT)
+
+
+class SolveTest(unittest.TestCase):
+
+	def testGoalInAnyOrientation(self):
+		import Rubik_2x2x2
+		for r in range(len(coord.ROTATIONS)):
+			self.assertTrue(Rubik_2x2x2.Cube(coord.rotate(Rubik_2x2x2.goalState.tiles, r)).goal())
+		self.assertFalse(Rubik_2x2x2.Cube(SOLVABLE).goal())
+
+	def testSolutionEndsAtGoal(self):
+		import Rubik_2x2x2
+		cube = Rubik_2x2x2.Cube(coord.rotate(SOLVABLE, 5))
+		for method in ("BREADTH_FIRST", "IT_DEPTH_FIRST", "BEST_FIRST", "BIDIRECTIONAL"):
+			solution = Rubik_2x2x2.solve(cube, method)
+			self.assertTrue(solution.states[-1].goal(), method)
+
+	def testBackTrackLimits(self):
+		import Rubik_2x2x2
+		cube = Rubik_2x2x2.Cube(coord.tiles(coord.NUM_STATES - 1))
+		solution = Rubik_2x2x2.solve(cube, "IT_BACKTRACK", { "nodes": 1000 })
+		self.assertIsNone(solution.moves)
+		self.assertEqual(solution.stats["expanded"], 1000)
+
+	def testBackTrack(self):
+		import Rubik_2x2x2
+		cube = Rubik_2x2x2.Cube(SOLVABLE)
+		solution = Rubik_2x2x2.solve(cube, "IT_BACKTRACK")
+		expected = Rubik_2x2x2.solve(cube, "IT_DEPTH_FIRST")
+		self.assertEqual(len(solution.moves), len(expected.moves))
+		self.assertGreater(solution.stats["expanded"], 0)
+
+
+class HeuristicTest(unittest.TestCase):
+
+	def testValueRequired(self):
+		import Rubik_2x2x2
+		class NoValue(Rubik_2x2x2.Heuristic):
+			pass
+		with self.assertRaises(TypeError):
+			NoValue()
+
+	def testMisplacedTiles(self):
+		import Rubik_2x2x2
+		self.assertEqual(Rubik_2x2x2.MisplacedTiles().value(Rubik_2x2x2.goalState.state), 0)
+
+
+class CubeBatchTest(unittest.TestCase):
+	#============================================================================
+	# The vectorized rank and unrank agree with Rubik_2x2x2_coord
+	#============================================================================
+
+	def testRoundTrip(self):
+		import numpy as np
+		import Rubik_2x2x2_numpy
+		indices = np.arange(0, coord.NUM_STATES, 997)
+		batch = Rubik_2x2x2_numpy.CubeBatch.fromIndices(indices)
+		for i, row in zip(indices[:50], batch.tiles):
+			self.assertEqual(row.tobytes().decode(), coord.tiles(int(i)))
+		self.assertTrue((batch.indices() == indices).all())
+
+	def testUnreachable(self):
+		import numpy as np
+		import Rubik_2x2x2_numpy
+		tiles = np.frombuffer(DBL_IN_FREE_SLOT.encode(), dtype=np.uint8)
+		with self.assertRaises(ValueError):
+			Rubik_2x2x2_numpy.CubeBatch(tiles).indices()
+
+
+class BatchTest(unittest.TestCase):
+	#============================================================================
+	# An unreachable line is an error record, found before any search
+	#============================================================================
+
+	def testUnreachable(self):
+		import time
+		import Rubik_2x2x2_batch
+		Rubik_2x2x2_batch.initWorker("BIDIRECTIONAL", None)
+		start = time.perf_counter()
+		record = json.loads(Rubik_2x2x2_batch.solveLine(TWISTED_CORNER))
+		self.assertLess(time.perf_counter() - start, 1)
+		self.assertEqual(record["config"], TWISTED_CORNER)
+		self.assertIn("error", record)
+
+
+class SolutionCacheTest(unittest.TestCase):
+	#============================================================================
+	# A solution hit only in the memory LRU is still recently used on disk
+	#============================================================================
+
+	def testMemoryHitSurvivesEviction(self):
+		import Rubik_2x2x2
+		import Rubik_2x2x2_cache
+		cache = Rubik_2x2x2_cache.SolutionCache(":memory:", maxEntries=10)
+		try:
+			cubes = [ Rubik_2x2x2.Cube(coord.tiles(i)) for i in range(1, 12) ]
+			cache.put(cubes[0], ["U"])
+			for cube in cubes[1:10]:
+				cache.put(cube, ["R"])
+			self.assertEqual(cache.get(cubes[0]), ["U"])
+			cache.put(cubes[10], ["F"])
+			cache.memory.clear()
+			self.assertEqual(cache.get(cubes[0]), ["U"])
+			self.assertIsNone(cache.get(cubes[1]))
+		finally:
+			cache.close()
+
+
+class ParallelTest(unittest.TestCase):
+	#============================================================================
+	# A worker that fails or dies must not leave the others at the barrier
+	#============================================================================
+
+	def failingWorker(self, failure):
+		#========================================================================
+		# Patches the worker so that worker 1 calls failure() at its first
+		# barrier, with the other workers under way
+		#========================================================================
+		import Rubik_2x2x2_parallel
+		worker = Rubik_2x2x2_parallel.worker
+		class FailingBarrier:
+			def __init__(self, barrier):
+				self.barrier = barrier
+			def wait(self):
+				failure()
+			def abort(self):
+				self.barrier.abort()
+		def failing(w, workers, names, barrier, results):
+			if w == 1:
+				barrier = FailingBarrier(barrier)
+			return worker(w, workers, names, barrier, results)
+		return mock.patch.object(Rubik_2x2x2_parallel, "worker", failing)
+
+	def testWorkerRaises(self):
+		import Rubik_2x2x2_parallel
+		def fail():
+			raise RuntimeError("worker failed")
+		with self.failingWorker(fail), self.assertRaises(RuntimeError):
+			Rubik_2x2x2_parallel.distribution(3)
+
+	def testWorkerKilled(self):
+		import os
+		import Rubik_2x2x2_parallel
+		with self.failingWorker(lambda: os._exit(1)), self.assertRaises(RuntimeError):
+			Rubik_2x2x2_parallel.distribution(3)
+
+
+class ServerTest(unittest.TestCase):
+	#============================================================================
+	# A request that fails must not stop the batcher from serving the next
+	#============================================================================
+
+	SOLVABLE = "/solve?config=" + SOLVABLE
+
+	def setUp(self):
+		import Rubik_2x2x2_cache
+		import Rubik_2x2x2_server
+		self.server = Rubik_2x2x2_server
+		self.cache = Rubik_2x2x2_cache.SolutionCache(":memory:")
+
+	def tearDown(self):
+		self.cache.close()
+
+	def serve(self, targets):
+		#========================================================================
+		# (status, content type, body) of a GET of each target, made in turn
+		#========================================================================
+		async def main():
+			service = self.server.SolverService(self.cache)
+			batcher = asyncio.create_task(service.batcher())
+			try:
+				return [ await asyncio.wait_for(service.route("GET", target, b""), 10)
+				         for target in targets ]
+			finally:
+				batcher.cancel()
+		return asyncio.run(main())
+
+	def testValidAfterBadConfiguration(self):
+		bad, good = self.serve(["/solve?config=" + DBL_IN_FREE_SLOT, self.SOLVABLE])
+		self.assertEqual(bad[0], 400)
+		self.assertEqual(good[0], 200)
+
+	def testValidAfterFailedBatch(self):
+		solveBatch = self.server.SolverService.solveBatch
+		failed = []
+		def failOnce(service, batch):
+			if not failed:
+				failed.append(batch)
+				raise RuntimeError("batch failed")
+			return solveBatch(service, batch)
+		with mock.patch.object(self.server.SolverService, "solveBatch", failOnce):
+			bad, good, stats = self.serve([self.SOLVABLE, self.SOLVABLE, "/stats"])
+		self.assertEqual(bad[0], 500)
+		self.assertEqual(good[0], 200)
+		self.assertEqual(json.loads(stats[2])["requests"], 1)
+
+
+if __name__ == '__main__':
+	unittest.main()